@@ -0,0 +1,23 @@
+"""Add functional index on lower(username)"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0008_add_username_lower_index'
+down_revision = '0007_add_phone_e164'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_users_username_lower',
+        'users',
+        [sa.text('lower(username)')],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_username_lower', table_name='users', if_exists=True)
@@ -0,0 +1,23 @@
+"""Add functional index on lower(email)"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0009_add_email_lower_index'
+down_revision = '0008_add_username_lower_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_users_email_lower',
+        'users',
+        [sa.text('lower(email)')],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_lower', table_name='users', if_exists=True)
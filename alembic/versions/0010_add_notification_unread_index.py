@@ -0,0 +1,24 @@
+"""Add index on notifications (user_id, read)"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0010_add_notification_unread_index'
+down_revision = '0009_add_email_lower_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_notifications_user_read',
+        'notifications',
+        ['user_id', 'read'],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_notifications_user_read', table_name='notifications', if_exists=True
+    )
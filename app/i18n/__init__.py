@@ -18,7 +18,9 @@ LANGUAGES: Dict[str, str] = {
 LANGUAGE_SESSION_KEY = "language_code"
 TRANSLATIONS_DIR = Path(__file__).resolve().parent / "translations"
 
-_translation_cache: Dict[str, Mapping[str, Any]] = {}
+# Dotted key -> string per language, built once by ``load_translations`` so a
+# lookup is a single dict probe instead of a walk through the nested JSON.
+_flat_translations: Dict[str, Dict[str, str]] = {}
 
 
 def normalize_language(language: Optional[str]) -> Optional[str]:
@@ -63,22 +65,32 @@ def load_translations() -> None:
                 f"Translation file {file_path} must contain a JSON object as the root node."
             )
         loaded[code] = data
-    _translation_cache.clear()
-    _translation_cache.update(loaded)
+    _flat_translations.clear()
+    for code, data in loaded.items():
+        flat: Dict[str, str] = {}
+        _flatten_translations(data, "", flat)
+        _flat_translations[code] = flat
+
+
+def _flatten_translations(
+    node: Mapping[str, Any], prefix: str, out: Dict[str, str]
+) -> None:
+    for name, value in node.items():
+        if "." in name:
+            # Unreachable through a dotted lookup key; keep it that way.
+            continue
+        key = f"{prefix}{name}"
+        if isinstance(value, str):
+            out[key] = value
+        elif isinstance(value, Mapping):
+            _flatten_translations(value, f"{key}.", out)
 
 
 def _resolve_translation(language: str, key: str) -> Optional[str]:
-    translations = _translation_cache.get(language)
+    translations = _flat_translations.get(language)
     if not translations:
         return None
-    node: Any = translations
-    for part in key.split("."):
-        if not isinstance(node, Mapping) or part not in node:
-            return None
-        node = node[part]
-    if isinstance(node, str):
-        return node
-    return None
+    return translations.get(key)
 
 
 def translate(key: str, *, language: Optional[str] = None, default: Optional[str] = None) -> str:
@@ -0,0 +1,33 @@
+"""Compile the Jinja templates ahead of time.
+
+Run at image build time; ``main`` loads the archive with ``ModuleLoader`` when
+it exists and falls back to the ``templates`` directory otherwise.
+"""
+
+import argparse
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from app.utils.template_filters import TEMPLATE_FILTERS
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", default="templates")
+    parser.add_argument("--target", default="templates_compiled.zip")
+    args = parser.parse_args()
+    env = Environment(
+        loader=FileSystemLoader(args.source),
+        # Must match ``templates_env`` in main: autoescaping is baked into
+        # the compiled code.
+        autoescape=select_autoescape(["html", "xml"]),
+    )
+    # The same filter table main registers, so a template using a filter
+    # the app doesn't provide fails here rather than at render time.
+    env.filters.update(TEMPLATE_FILTERS)
+    env.compile_templates(args.target, zip="stored", ignore_errors=False)
+    print(f"Compiled {len(env.list_templates())} templates into {args.target}")
+
+
+if __name__ == "__main__":
+    main()
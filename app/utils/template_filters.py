@@ -0,0 +1,42 @@
+"""Custom Jinja filters registered on ``templates_env`` in main.
+
+Kept out of ``main`` so the build-time template precompiler can register the
+same filter table without importing the application.
+"""
+
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+
+@lru_cache(maxsize=8)
+def _zone(tz_name: str) -> ZoneInfo:
+    return ZoneInfo(tz_name)
+
+
+def bar_timezone() -> Optional[ZoneInfo]:
+    """Return the bars' timezone, or ``None`` to use the server's local time.
+
+    The timezone comes from the ``BAR_TIMEZONE`` environment variable (falling
+    back to ``TZ`` if set).
+    """
+    tz_name = os.getenv("BAR_TIMEZONE") or os.getenv("TZ")
+    return _zone(tz_name) if tz_name else None
+
+
+def format_time(dt: Optional[datetime]) -> str:
+    """Format a UTC datetime to local YYYY-MM-DD HH:MM string using BAR_TIMEZONE/TZ."""
+    if not dt:
+        return ""
+    tz = bar_timezone()
+    dt = dt.replace(tzinfo=timezone.utc)
+    if tz:
+        dt = dt.astimezone(tz)
+    return dt.strftime("%Y-%m-%d %H:%M")
+
+
+TEMPLATE_FILTERS = {
+    "format_time": format_time,
+}
@@ -142,11 +142,7 @@ async def handle_wallee_webhook(request: Request, db: Session = Depends(get_db))
             if order and order.customer_id:
                 cached = users.get(order.customer_id)
                 if cached:
-                    exists = any(
-                        getattr(t, "order_id", None) == order.id
-                        for t in cached.transactions
-                    )
-                    if not exists:
+                    if order.id not in cached.transactions_by_order:
                         bar = order.bar or db.get(Bar, order.bar_id)
                         tx = Transaction(
                             bar.id if bar else order.bar_id,
@@ -166,7 +162,7 @@ async def handle_wallee_webhook(request: Request, db: Session = Depends(get_db))
                             )
                             for i in order.items
                         ]
-                        cached.transactions.insert(0, tx)
+                        cached.add_transaction(tx, newest=True)
                         db.add(
                             WalletTransaction(
                                 user_id=order.customer_id,
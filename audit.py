@@ -5,6 +5,7 @@ from typing import Optional, Dict, Any
 
 from sqlalchemy.orm import Session
 
+from database import SessionLocal
 from models import AuditLog
 
 
@@ -42,3 +43,13 @@ def log_action(
     db.flush()
     db.commit()
     return log
+
+
+def log_action_in_new_session(**kwargs: Any) -> None:
+    """Persist an audit entry using a session of its own.
+
+    Meant for ``BackgroundTasks`` so the insert runs after the response is sent
+    and outside the request's session.
+    """
+    with SessionLocal() as db:
+        log_action(db, **kwargs)
@@ -23,8 +23,25 @@ if DATABASE_URL.startswith("sqlite"):
         poolclass=StaticPool,
         future=True,
     )
+    # Every checkout shares the single connection, so there is no cap.
+    POOL_CAPACITY = None
 else:
-    engine = create_engine(DATABASE_URL, future=True)
+    POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+    MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "30"))
+    # Most connections the pool hands out at once.
+    POOL_CAPACITY = POOL_SIZE + MAX_OVERFLOW
+    # LIFO checkout keeps a small set of warm connections busy and lets idle
+    # overflow connections age out; pre-ping and recycle guard against
+    # connections dropped by the server or a proxy in between.
+    engine = create_engine(
+        DATABASE_URL,
+        future=True,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        pool_pre_ping=True,
+        pool_use_lifo=True,
+    )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -1,13 +1,16 @@
 from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
 
 PLATFORM_FEE_RATE = Decimal('0.05')
 
 
+@lru_cache(maxsize=1024)
 def calculate_vat_from_gross(price_gross: Decimal, vat_rate: Decimal) -> Decimal:
     """Return the VAT component from a gross price.
 
     VAT rate is expressed as a percentage (e.g. Decimal('7.7') for 7.7%).
-    The calculation assumes `price_gross` already includes VAT.
+    The calculation assumes `price_gross` already includes VAT. Results are
+    memoised since menus reuse a handful of (price, rate) pairs.
     """
     if not vat_rate:
         return Decimal('0.00')
@@ -37,19 +37,23 @@ import os
 import io
 import asyncio
 import hashlib
+import hmac
 import ipaddress
 import logging
 import json
+import heapq
 import random
 import re
 import secrets
 import time
 from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from datetime import date, datetime, timedelta
 from types import SimpleNamespace
-from urllib.parse import urlparse, urlsplit
+from urllib.parse import quote, urlparse, urlsplit
 from zoneinfo import ZoneInfo
 
 CH_TZ = ZoneInfo("Europe/Zurich")
@@ -295,16 +299,8 @@ class ImageUploadError(Exception):
     """Raised when an uploaded product image fails validation."""
 
 
-async def process_image_upload(
-    upload_file: UploadFile,
-) -> tuple[bytes, str, str]:
-    """Return sanitised image bytes, extension, and MIME type for an upload."""
-
-    data = await upload_file.read()
-    if not data:
-        raise ImageUploadError("Select a valid image (JPEG, PNG or WebP).")
-    if len(data) > MAX_PRODUCT_IMAGE_BYTES:
-        raise ImageUploadError("Product images must be 5MB or smaller.")
+def _sanitise_image(data: bytes) -> tuple[bytes, str, str]:
+    """Re-encode image ``data`` with Pillow; blocking, so run it off the loop."""
 
     try:
         Image.open(io.BytesIO(data)).verify()
@@ -333,26 +329,49 @@ async def process_image_upload(
         raise
     except OSError:
         raise ImageUploadError("Select a valid image (JPEG, PNG or WebP).")
-    finally:
-        await upload_file.close()
 
     extension, mime = ALLOWED_PRODUCT_IMAGE_FORMATS[image_format]
     return sanitised_bytes, extension, mime
 
 
+async def process_image_upload(
+    upload_file: UploadFile,
+) -> tuple[bytes, str, str]:
+    """Return sanitised image bytes, extension, and MIME type for an upload."""
+
+    try:
+        # Read one byte past the limit so oversized uploads are rejected
+        # without pulling the whole file into memory.
+        data = await upload_file.read(MAX_PRODUCT_IMAGE_BYTES + 1)
+        if not data:
+            raise ImageUploadError("Select a valid image (JPEG, PNG or WebP).")
+        if len(data) > MAX_PRODUCT_IMAGE_BYTES:
+            raise ImageUploadError("Product images must be 5MB or smaller.")
+        return await to_thread.run_sync(_sanitise_image, data)
+    finally:
+        await upload_file.close()
+
+
+# Created once at startup (and tracked in git) rather than on every save
+UPLOADS_DIR = os.path.join("static", "uploads")
+
+
+def _write_file(path: str, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+
+
 async def save_product_image(upload_file: UploadFile) -> str:
     """Validate and persist an uploaded product image, returning its URL."""
 
     data, extension, _ = await process_image_upload(upload_file)
-    uploads_dir = os.path.join("static", "uploads")
-    os.makedirs(uploads_dir, exist_ok=True)
     filename = f"{uuid4().hex}.{extension}"
-    file_path = os.path.join(uploads_dir, filename)
-    with open(file_path, "wb") as f:
-        f.write(data)
+    file_path = os.path.join(UPLOADS_DIR, filename)
+    await to_thread.run_sync(_write_file, file_path, data)
     return f"/static/uploads/{filename}"
 
 from fastapi import (
+    BackgroundTasks,
     Depends,
     FastAPI,
     HTTPException,
@@ -365,23 +384,29 @@ from fastapi import (
     Response,
     Form,
 )
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, PlainTextResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from PIL import Image, UnidentifiedImageError
 from fastapi.middleware.cors import CORSMiddleware
 from jinja2 import (
     Environment,
+    FileSystemBytecodeCache,
     FileSystemLoader,
+    ModuleLoader,
+    TemplateError,
     select_autoescape,
     pass_context,
 )
-from sqlalchemy import inspect, text, func, extract, or_, and_
-from sqlalchemy.orm import Session, joinedload
+from jinja2.bccache import Bucket
+from sqlalchemy import inspect, insert, text, func, extract, or_, and_
+from sqlalchemy.orm import Session, joinedload, selectinload
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES, GZipMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from argon2 import PasswordHasher, exceptions as argon2_exceptions
+from anyio import to_thread
 
-from database import Base, SessionLocal, engine, get_db
+from database import POOL_CAPACITY, Base, SessionLocal, engine, get_db
 from uuid import uuid4
 from models import (
     Bar as BarModel,
@@ -409,7 +434,7 @@ from models import (
     LoginRateLimit,
 )
 from pydantic import BaseModel, constr, ConfigDict, ValidationError
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 import math
 from finance import (
     calculate_platform_fee,
@@ -418,8 +443,8 @@ from finance import (
     PLATFORM_FEE_RATE,
 )
 from payouts import schedule_payout
-from audit import log_action
-from urllib.parse import urljoin, urlencode
+from audit import log_action, log_action_in_new_session
+from urllib.parse import urlencode
 from app.webhooks.wallee import router as wallee_webhook_router
 from wallee.models import AddressCreate, LineItemCreate, TransactionCreate
 from wallee.rest import ApiException
@@ -434,6 +459,7 @@ from app.i18n import (
     translator_for_request,
 )
 from app.utils.disposable_email import ensure_not_disposable, get_disposable_stats
+from app.utils.template_filters import TEMPLATE_FILTERS, bar_timezone
 
 # Predefined categories for bars (used for filtering and admin forms)
 BAR_CATEGORIES = [
@@ -547,6 +573,16 @@ def resolve_notification_text(note: Notification, language_code: str) -> Tuple[s
 
 
 class Category:
+    __slots__ = (
+        "id",
+        "name_translations",
+        "description_translations",
+        "name",
+        "description",
+        "display_order",
+        "photo_url",
+    )
+
     def __init__(
         self,
         id: int,
@@ -575,6 +611,18 @@ class Category:
 
 
 class Product:
+    __slots__ = (
+        "id",
+        "category_id",
+        "name_translations",
+        "description_translations",
+        "name",
+        "price",
+        "description",
+        "display_order",
+        "photo_url",
+    )
+
     def __init__(
         self,
         id: int,
@@ -609,12 +657,22 @@ class Product:
 
 
 class Table:
+    __slots__ = ("id", "name", "description")
+
     def __init__(self, id: int, name: str, description: str = ""):
         self.id = id
         self.name = name
         self.description = description
 
 
+def bar_search_blob(*fields: Optional[str]) -> str:
+    """Join searchable bar fields into one lowercase string.
+
+    Fields are newline separated so a term cannot match across two of them.
+    """
+    return "\n".join(field or "" for field in fields).lower()
+
+
 class Bar:
     def __init__(
         self,
@@ -651,14 +709,85 @@ class Bar:
         self.ordering_paused = ordering_paused
         self.opening_hours = opening_hours or {}
         self.bar_categories = bar_categories or []
+        self.search_blob = bar_search_blob(name, address, city, state)
         self.categories: Dict[int, Category] = {}
         self.products: Dict[int, Product] = {}
         self.tables: Dict[int, Table] = {}
+        # Menu grouped for the bar page; rebuilt lazily after menu changes
+        self._products_by_category: Optional[List[Tuple[Category, List[Product]]]] = None
         # Users assigned to this bar
-        self.bar_admin_ids: List[int] = []
-        self.bartender_ids: List[int] = []
+        self.bar_admin_ids: set[int] = set()
+        self.bartender_ids: set[int] = set()
         # Bartenders that still need to confirm the assignment
-        self.pending_bartender_ids: List[int] = []
+        self.pending_bartender_ids: set[int] = set()
+
+    def add_category(self, category: Category) -> None:
+        self.categories[category.id] = category
+        self._products_by_category = None
+
+    def remove_category(self, category_id: int) -> None:
+        """Drop a category together with the products filed under it."""
+        self.categories.pop(category_id, None)
+        stale_product_ids = [
+            pid for pid, p in self.products.items() if p.category_id == category_id
+        ]
+        for pid in stale_product_ids:
+            del self.products[pid]
+        self._products_by_category = None
+
+    def remove_product(self, product_id: int) -> None:
+        self.products.pop(product_id, None)
+        self._products_by_category = None
+
+    def invalidate_menu(self) -> None:
+        """Forget the grouped menu after categories or products were edited."""
+        self._products_by_category = None
+
+    def products_by_category(self) -> List[Tuple[Category, List[Product]]]:
+        """Return ``(category, products)`` pairs sorted by display order."""
+        if self._products_by_category is None:
+            grouped: Dict[int, List[Product]] = {}
+            for prod in self.products.values():
+                if prod.category_id in self.categories:
+                    grouped.setdefault(prod.category_id, []).append(prod)
+            for prods in grouped.values():
+                prods.sort(key=lambda p: p.display_order)
+            self._products_by_category = sorted(
+                ((self.categories[cid], prods) for cid, prods in grouped.items()),
+                key=lambda kv: kv[0].display_order,
+            )
+        return self._products_by_category
+
+    @property
+    def staff_ids(self) -> List[int]:
+        """Return bar admins followed by bartenders in a stable order."""
+        return sorted(self.bar_admin_ids) + sorted(self.bartender_ids)
+
+    def add_staff(self, user_id: int, role: str) -> None:
+        """Assign ``user_id`` to this bar, replacing any previous staff role."""
+        if role == "bar_admin":
+            self.bartender_ids.discard(user_id)
+            self.bar_admin_ids.add(user_id)
+        else:
+            self.bar_admin_ids.discard(user_id)
+            self.bartender_ids.add(user_id)
+        bar_ids_by_staff[user_id].add(self.id)
+
+    def remove_staff(self, user_id: int) -> None:
+        """Drop ``user_id`` from this bar's admins and bartenders."""
+        self.bar_admin_ids.discard(user_id)
+        self.bartender_ids.discard(user_id)
+        staff_bars = bar_ids_by_staff.get(user_id)
+        if staff_bars is not None:
+            staff_bars.discard(self.id)
+            if not staff_bars:
+                del bar_ids_by_staff[user_id]
+
+    def clear_staff(self) -> None:
+        """Remove every staff assignment, keeping the reverse index in sync."""
+        for user_id in self.bar_admin_ids | self.bartender_ids:
+            self.remove_staff(user_id)
+        self.pending_bartender_ids.clear()
 
 
 def get_bar_description_for_language(bar: Any, language_code: str) -> str:
@@ -737,7 +866,55 @@ def get_product_description_for_language(product: Any, language_code: str) -> st
     return value[:190]
 
 
+# Integer role codes so the hot ``is_*`` predicates compare small ints
+(
+    ROLE_CUSTOMER,
+    ROLE_SUPER_ADMIN,
+    ROLE_BAR_ADMIN,
+    ROLE_BARTENDER,
+    ROLE_DISPLAY,
+    ROLE_BLOCKED,
+    ROLE_FINANCE,
+    ROLE_IP_BLOCK,
+    ROLE_OTHER,
+) = range(9)
+ROLE_CODES: Dict[str, int] = {
+    "customer": ROLE_CUSTOMER,
+    "super_admin": ROLE_SUPER_ADMIN,
+    "bar_admin": ROLE_BAR_ADMIN,
+    "bartender": ROLE_BARTENDER,
+    "display": ROLE_DISPLAY,
+    "blocked": ROLE_BLOCKED,
+    "finance": ROLE_FINANCE,
+    "ip_block": ROLE_IP_BLOCK,
+}
+# Canonical role strings, so users share one object per role rather than a
+# fresh copy decoded from each form post or database row.
+ROLE_NAMES: Dict[str, str] = {name: name for name in ROLE_CODES}
+
+
 class DemoUser:
+    __slots__ = (
+        "id",
+        "username",
+        "password_hash",
+        "password",
+        "email",
+        "phone",
+        "prefix",
+        "phone_e164",
+        "phone_region",
+        "_role",
+        "role_code",
+        "base_role",
+        "bar_ids",
+        "pending_bar_id",
+        "credit",
+        "transactions",
+        "transactions_by_order",
+        "current_ip",
+    )
+
     def __init__(
         self,
         id: int,
@@ -771,35 +948,55 @@ class DemoUser:
         self.pending_bar_id = pending_bar_id
         self.credit = credit
         self.transactions: List[Transaction] = []
+        # Order id -> wallet feed entry, so status updates skip the list scan
+        self.transactions_by_order: Dict[int, Transaction] = {}
         self.current_ip: Optional[str] = None
 
+    def add_transaction(self, tx: Transaction, newest: bool = False) -> None:
+        """Record an order transaction in the wallet feed."""
+        if newest:
+            self.transactions.insert(0, tx)
+        else:
+            self.transactions.append(tx)
+        if tx.order_id is not None:
+            self.transactions_by_order[tx.order_id] = tx
+
+    @property
+    def role(self) -> str:
+        return self._role
+
+    @role.setter
+    def role(self, value: str) -> None:
+        self._role = ROLE_NAMES.get(value, value)
+        self.role_code = ROLE_CODES.get(value, ROLE_OTHER)
+
     @property
     def is_super_admin(self) -> bool:
-        return self.role == "super_admin"
+        return self.role_code == ROLE_SUPER_ADMIN
 
     @property
     def is_bar_admin(self) -> bool:
-        return self.role == "bar_admin"
+        return self.role_code == ROLE_BAR_ADMIN
 
     @property
     def is_bartender(self) -> bool:
-        return self.role == "bartender"
+        return self.role_code == ROLE_BARTENDER
 
     @property
     def is_display(self) -> bool:
-        return self.role == "display"
+        return self.role_code == ROLE_DISPLAY
 
     @property
     def is_blocked(self) -> bool:
-        return self.role == "blocked"
+        return self.role_code == ROLE_BLOCKED
 
     @property
     def is_finance(self) -> bool:
-        return self.role == "finance"
+        return self.role_code == ROLE_FINANCE
 
     @property
     def is_ip_blocked(self) -> bool:
-        return self.role == "ip_block"
+        return self.role_code == ROLE_IP_BLOCK
 
     @property
     def bar_id(self) -> Optional[int]:
@@ -811,6 +1008,8 @@ class DemoUser:
 
 
 class CartItem:
+    __slots__ = ("product", "quantity")
+
     def __init__(self, product: Product, quantity: int = 1):
         self.product = product
         self.quantity = quantity
@@ -821,6 +1020,8 @@ class CartItem:
 
 
 class TransactionItem:
+    __slots__ = ("name", "quantity", "price")
+
     def __init__(self, name: str, quantity: int, price: float):
         self.name = name
         self.quantity = quantity
@@ -864,33 +1065,119 @@ class BlockedIPEntry:
         self.created_at = created_at
 
 
+class BarCard:
+    """Listing view of a bar; keeps per-request values off the ORM instance."""
+
+    __slots__ = (
+        "id",
+        "name",
+        "address",
+        "city",
+        "state",
+        "latitude",
+        "longitude",
+        "rating",
+        "bar_categories",
+        "description",
+        "description_translations",
+        "photo_url",
+        "is_open_now",
+        "distance_km",
+    )
+
+    def __init__(
+        self,
+        bar: BarModel,
+        photo_url: Optional[str],
+        is_open_now: bool,
+        distance_km: Optional[float] = None,
+    ):
+        self.id = bar.id
+        self.name = bar.name
+        self.address = bar.address
+        self.city = bar.city
+        self.state = bar.state
+        self.latitude = bar.latitude
+        self.longitude = bar.longitude
+        self.rating = bar.rating
+        self.bar_categories = bar.bar_categories
+        self.description = bar.description
+        self.description_translations = bar.description_translations
+        self.photo_url = photo_url
+        self.is_open_now = is_open_now
+        self.distance_km = distance_km
+
+
+def bar_cards(
+    db_bars: Iterable[BarModel],
+    request: Request,
+    distance_from: Optional[Callable[[float, float], float]] = None,
+) -> List[BarCard]:
+    """Build listing cards with absolute photos, open state and distance."""
+    now = bar_local_now()
+    cards = []
+    for bar in db_bars:
+        distance_km = None
+        if (
+            distance_from is not None
+            and bar.latitude is not None
+            and bar.longitude is not None
+        ):
+            distance_km = distance_from(float(bar.latitude), float(bar.longitude))
+        cards.append(
+            BarCard(
+                bar,
+                make_absolute_url(bar.photo_url, request),
+                is_bar_open_now(bar, now),
+                distance_km,
+            )
+        )
+    return cards
+
+
 class Cart:
     def __init__(self):
         self.items: Dict[int, CartItem] = {}
         self.table_id: Optional[int] = None
         self.bar_id: Optional[int] = None
+        # Sum of item quantities, kept in step with every mutation below
+        self._count = 0
+
+    @property
+    def count(self) -> int:
+        return self._count
 
     def add(self, product: Product):
         if product.id in self.items:
             self.items[product.id].quantity += 1
         else:
             self.items[product.id] = CartItem(product, 1)
+        self._count += 1
 
     def remove(self, product_id: int):
-        if product_id in self.items:
-            del self.items[product_id]
+        item = self.items.pop(product_id, None)
+        if item is not None:
+            self._count -= item.quantity
         if not self.items:
             self.bar_id = None
 
     def update_quantity(self, product_id: int, quantity: int):
-        if product_id in self.items:
+        item = self.items.get(product_id)
+        if item is not None:
             if quantity <= 0:
                 del self.items[product_id]
+                self._count -= item.quantity
             else:
-                self.items[product_id].quantity = quantity
+                self._count += quantity - item.quantity
+                item.quantity = quantity
         if not self.items:
             self.bar_id = None
 
+    def replace_items(self, items: Dict[int, CartItem]) -> None:
+        self.items.clear()
+        self.items.update(items)
+        self._count = sum(item.quantity for item in items.values())
+
     def total_price(self) -> float:
         return sum(item.total for item in self.items.values())
 
@@ -903,6 +1190,7 @@ class Cart:
 
     def clear(self):
         self.items.clear()
+        self._count = 0
         self.table_id = None
         self.bar_id = None
 
@@ -923,10 +1211,12 @@ class Cart:
         cart.table_id = data.get("table_id")
         bar = bars.get(cart.bar_id) if cart.bar_id else None
         if bar:
+            items: Dict[int, CartItem] = {}
             for item in data.get("items", []):
                 product = bar.products.get(item["product_id"])
                 if product:
-                    cart.items[product.id] = CartItem(product, item["quantity"])
+                    items[product.id] = CartItem(product, item["quantity"])
+            cart.replace_items(items)
         return cart
 
 
@@ -1173,10 +1463,7 @@ class BlockRedirectMiddleware(BaseHTTPMiddleware):
                     or path == "/favicon.ico"
                 )
                 if not allowed:
-                    return RedirectResponse(
-                        url=redirect_target,
-                        status_code=status.HTTP_303_SEE_OTHER,
-                    )
+                    return see_other(redirect_target)
         return await call_next(request)
 
 
@@ -1193,10 +1480,7 @@ class RegisterRedirectMiddleware(BaseHTTPMiddleware):
                 or path == "/favicon.ico"
             )
             if not allowed:
-                return RedirectResponse(
-                    url="/register/details",
-                    status_code=status.HTTP_303_SEE_OTHER,
-                )
+                return see_other("/register/details")
         return await call_next(request)
 
 
@@ -1215,14 +1499,9 @@ class DisplayRedirectMiddleware(BaseHTTPMiddleware):
             )
             if not allowed:
                 if user.bar_id:
-                    return RedirectResponse(
-                        url=f"/dashboard/bar/{user.bar_id}/orders",
-                        status_code=status.HTTP_303_SEE_OTHER,
-                    )
+                    return see_other(f"/dashboard/bar/{user.bar_id}/orders")
                 request.session.clear()
-                return RedirectResponse(
-                    url="/", status_code=status.HTTP_303_SEE_OTHER
-                )
+                return see_other("/")
         return await call_next(request)
 
 
@@ -1253,7 +1532,8 @@ class AuditLogMiddleware(BaseHTTPMiddleware):
 
 # Allow cross-origin requests from configured frontends
 origins_env = os.getenv("FRONTEND_ORIGINS", "http://localhost:5173")
-origins = [o.strip() for o in origins_env.split(",") if o.strip()]
+# A frozenset keeps the per-request origin check a hash lookup.
+origins = frozenset(o.strip() for o in origins_env.split(",") if o.strip())
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -1282,6 +1562,14 @@ app.add_middleware(
 )
 app.add_middleware(HostValidationMiddleware)
 app.add_middleware(SecurityHeadersMiddleware)
+# Outermost so the final body, headers included, is what gets compressed.
+# HTML is left uncompressed: pages carry the session CSRF token next to
+# reflected input (e.g. the search query), which is what BREACH needs.
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=1024,
+    exclude_content_types=(*DEFAULT_EXCLUDED_CONTENT_TYPES, "text/html"),
+)
 
 
 # -----------------------------------------------------------------------------
@@ -1348,14 +1636,14 @@ def update_cached_order_transactions(order: Order, new_status: str) -> None:
     cached_user = users.get(order.customer_id)
     if not cached_user:
         return
-    for tx in cached_user.transactions:
-        if getattr(tx, "order_id", None) == order.id:
-            if new_status in ("ACCEPTED", "READY", "COMPLETED"):
-                tx.status = "COMPLETED"
-            elif new_status in ("CANCELED", "REJECTED"):
-                tx.status = "CANCELED"
-                tx.total = 0.0
-            break
+    tx = cached_user.transactions_by_order.get(order.id)
+    if tx is None:
+        return
+    if new_status in ("ACCEPTED", "READY", "COMPLETED"):
+        tx.status = "COMPLETED"
+    elif new_status in ("CANCELED", "REJECTED"):
+        tx.status = "CANCELED"
+        tx.total = 0.0
 
 
 def apply_order_status(
@@ -1486,10 +1774,43 @@ def seed_super_admin():
             )
             db.add(user)
             db.commit()
+        elif not (existing.password_hash or "").startswith("$argon2") and verify_password(
+            existing.password_hash or "", admin_password
+        ):
+            # Upgrade legacy SHA-256 admin hashes the first time we see them.
+            existing.password_hash = hash_password(admin_password)
+            db.commit()
     finally:
         db.close()
 
 
+# Column names per table, reflected in one pass while startup runs the
+# ``ensure_*`` checks below. Each check only looks at the columns it adds itself,
+# so a snapshot taken before any ALTER stays accurate for the whole pass.
+_schema_columns: Optional[Dict[str, set]] = None
+
+
+@contextmanager
+def schema_snapshot():
+    """Reflect every table's columns once for the duration of the block."""
+    global _schema_columns
+    _schema_columns = {
+        table: {col["name"] for col in cols}
+        for (_schema, table), cols in inspect(engine).get_multi_columns().items()
+    }
+    try:
+        yield
+    finally:
+        _schema_columns = None
+
+
+def table_columns(table: str) -> set:
+    """Return column names of ``table``, from the startup snapshot if present."""
+    if _schema_columns is not None and table in _schema_columns:
+        return _schema_columns[table]
+    return {col["name"] for col in inspect(engine).get_columns(table)}
+
+
 def ensure_role_enum() -> None:
     """Ensure the role enum includes required states."""
     if engine.dialect.name != "postgresql":
@@ -1511,8 +1832,7 @@ def ensure_role_enum() -> None:
 
 def ensure_prefix_column():
     """Add the `prefix` column to users table if it's missing."""
-    inspector = inspect(engine)
-    columns = [col["name"] for col in inspector.get_columns("users")]
+    columns = table_columns("users")
     if "prefix" not in columns:
         with engine.begin() as conn:
             conn.execute(text("ALTER TABLE users ADD COLUMN prefix VARCHAR(10)"))
@@ -1520,8 +1840,7 @@ def ensure_prefix_column():
 
 def ensure_phone_columns():
     """Add the phone_e164 and phone_region columns if missing."""
-    inspector = inspect(engine)
-    columns = [col["name"] for col in inspector.get_columns("users")]
+    columns = table_columns("users")
     with engine.begin() as conn:
         if "phone_e164" not in columns:
             conn.execute(text("ALTER TABLE users ADD COLUMN phone_e164 VARCHAR(16)"))
@@ -1536,8 +1855,7 @@ def ensure_phone_columns():
 
 def ensure_credit_column() -> None:
     """Add the `credit` column to users table if it's missing."""
-    inspector = inspect(engine)
-    columns = [col["name"] for col in inspector.get_columns("users")]
+    columns = table_columns("users")
     if "credit" not in columns:
         with engine.begin() as conn:
             conn.execute(
@@ -1547,8 +1865,7 @@ def ensure_credit_column() -> None:
 
 def ensure_bar_columns() -> None:
     """Ensure recently added columns exist on the bars table."""
-    inspector = inspect(engine)
-    columns = {col["name"] for col in inspector.get_columns("bars")}
+    columns = table_columns("bars")
     required = {
         "city": "VARCHAR(100)",
         "state": "VARCHAR(100)",
@@ -1594,8 +1911,7 @@ def ensure_bar_columns() -> None:
 
 def ensure_category_columns() -> None:
     """Ensure expected columns exist on the categories table."""
-    inspector = inspect(engine)
-    columns = {col["name"] for col in inspector.get_columns("categories")}
+    columns = table_columns("categories")
     required = {
         "description": "TEXT",
         "photo_url": "VARCHAR(255)",
@@ -1650,8 +1966,7 @@ def ensure_category_columns() -> None:
 
 def ensure_menu_item_columns() -> None:
     """Ensure expected columns exist on the menu_items table."""
-    inspector = inspect(engine)
-    columns = {col["name"] for col in inspector.get_columns("menu_items")}
+    columns = table_columns("menu_items")
     required = {
         "sort_order": "INTEGER",
         "photo": "VARCHAR(255)",
@@ -1727,8 +2042,7 @@ def ensure_menu_item_columns() -> None:
 
 def ensure_order_columns() -> None:
     """Ensure expected columns exist on the orders table."""
-    inspector = inspect(engine)
-    columns = {col["name"] for col in inspector.get_columns("orders")}
+    columns = table_columns("orders")
     required = {
         "table_id": "INTEGER",
         "vat_total": "NUMERIC(10, 2) DEFAULT 0",
@@ -1799,8 +2113,7 @@ def generate_public_order_code(db: Session, bar_id: int, created_at: datetime):
 
 def ensure_wallet_topup_columns() -> None:
     """Ensure expected columns exist on the wallet_topups table."""
-    inspector = inspect(engine)
-    columns = {col["name"] for col in inspector.get_columns("wallet_topups")}
+    columns = table_columns("wallet_topups")
     if "wallee_tx_id" not in columns:
         with engine.begin() as conn:
             if "wallee_transaction_id" in columns:
@@ -1836,8 +2149,7 @@ def ensure_wallet_topup_columns() -> None:
 
 def ensure_bar_closing_columns() -> None:
     """Ensure expected columns exist on the bar_closings table."""
-    inspector = inspect(engine)
-    columns = {col["name"] for col in inspector.get_columns("bar_closings")}
+    columns = table_columns("bar_closings")
     if "payment_confirmed" not in columns:
         with engine.begin() as conn:
             conn.execute(
@@ -1849,8 +2161,7 @@ def ensure_bar_closing_columns() -> None:
 
 def ensure_audit_log_columns() -> None:
     """Ensure expected columns exist on the audit_logs table."""
-    inspector = inspect(engine)
-    columns = {col["name"] for col in inspector.get_columns("audit_logs")}
+    columns = table_columns("audit_logs")
     required = {
         "ip": "VARCHAR(50)",
         "user_agent": "VARCHAR(255)",
@@ -1872,8 +2183,7 @@ def ensure_audit_log_columns() -> None:
 
 def ensure_notification_log_column() -> None:
     """Ensure notifications tables include translation support."""
-    inspector = inspect(engine)
-    columns = {col["name"] for col in inspector.get_columns("notifications")}
+    columns = table_columns("notifications")
     if "log_id" not in columns:
         with engine.begin() as conn:
             conn.execute(
@@ -1905,9 +2215,7 @@ def ensure_notification_log_column() -> None:
                 )
             )
 
-    log_columns = {
-        col["name"] for col in inspector.get_columns("notification_logs")
-    }
+    log_columns = table_columns("notification_logs")
     if "subject_translations" not in log_columns:
         with engine.begin() as conn:
             conn.execute(
@@ -1994,7 +2302,7 @@ def ensure_welcome_message_table() -> None:
                 },
             )
     else:
-        columns = {col["name"] for col in inspector.get_columns("welcome_message")}
+        columns = table_columns("welcome_message")
         with engine.begin() as conn:
             if "subject_translations" not in columns:
                 conn.execute(
@@ -2067,24 +2375,44 @@ def ensure_welcome_message_table() -> None:
                     )
 
 
+# Worker threads available to sync (SQLAlchemy-backed) routes. The app keeps
+# bars, users and carts in process memory, so it must run as a single worker
+# process; a larger threadpool is how it absorbs concurrent blocking requests.
+# Each thread may hold a pooled connection, so the size defaults to, and is
+# capped at, the pool's capacity: extra threads would only wait on checkout
+# until ``pool_timeout`` and then fail.
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", str(POOL_CAPACITY or 40)))
+if POOL_CAPACITY is not None and THREADPOOL_SIZE > POOL_CAPACITY:
+    logger.warning(
+        "THREADPOOL_SIZE=%d exceeds DB_POOL_SIZE + DB_MAX_OVERFLOW=%d; capping it",
+        THREADPOOL_SIZE,
+        POOL_CAPACITY,
+    )
+    THREADPOOL_SIZE = POOL_CAPACITY
+
+
 @app.on_event("startup")
 async def on_startup():
     """Initialise database tables on startup."""
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
     load_translations()
+    warm_template_cache()
+    os.makedirs(UPLOADS_DIR, exist_ok=True)
     Base.metadata.create_all(bind=engine)
-    ensure_role_enum()
-    ensure_prefix_column()
-    ensure_phone_columns()
-    ensure_credit_column()
-    ensure_bar_columns()
-    ensure_category_columns()
-    ensure_menu_item_columns()
-    ensure_order_columns()
-    ensure_wallet_topup_columns()
-    ensure_bar_closing_columns()
-    ensure_audit_log_columns()
-    ensure_notification_log_column()
-    ensure_welcome_message_table()
+    with schema_snapshot():
+        ensure_role_enum()
+        ensure_prefix_column()
+        ensure_phone_columns()
+        ensure_credit_column()
+        ensure_bar_columns()
+        ensure_category_columns()
+        ensure_menu_item_columns()
+        ensure_order_columns()
+        ensure_wallet_topup_columns()
+        ensure_bar_closing_columns()
+        ensure_audit_log_columns()
+        ensure_notification_log_column()
+        ensure_welcome_message_table()
     users.clear()
     users_by_username.clear()
     users_by_email.clear()
@@ -2098,12 +2426,69 @@ async def on_startup():
 
 
 # Jinja2 environment for rendering HTML templates
+# Bytecode cache for source templates; disabled unless a directory is given
+JINJA_CACHE_DIR = os.getenv("JINJA_CACHE_DIR")
+# Built by ``python -m app.scripts.precompile_templates`` in the Docker image
+COMPILED_TEMPLATES_PATH = os.getenv(
+    "COMPILED_TEMPLATES_PATH", "templates_compiled.zip"
+)
+
+
+def _template_loader() -> FileSystemLoader | ModuleLoader:
+    """Prefer ahead-of-time compiled templates when the archive exists."""
+    if os.path.exists(COMPILED_TEMPLATES_PATH):
+        return ModuleLoader(COMPILED_TEMPLATES_PATH)
+    return FileSystemLoader("templates")
+
+
+class _LazyBytecodeCache(FileSystemBytecodeCache):
+    """Bytecode cache that creates its directory on the first write."""
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            super().dump_bytecode(bucket)
+        except OSError:
+            logger.debug("Jinja bytecode cache %s is unwritable", self.directory)
+
+
+def _jinja_bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    """Return an on-disk bytecode cache when ``JINJA_CACHE_DIR`` is set.
+
+    Compiled templates never hit the compiler, so no cache is used for them.
+    """
+    if not JINJA_CACHE_DIR or os.path.exists(COMPILED_TEMPLATES_PATH):
+        return None
+    return _LazyBytecodeCache(directory=os.path.abspath(JINJA_CACHE_DIR))
+
+
 templates_env = Environment(
-    loader=FileSystemLoader("templates"),
+    loader=_template_loader(),
     autoescape=select_autoescape(["html", "xml"]),
+    bytecode_cache=_jinja_bytecode_cache(),
+    # Templates ship with the release; skip the mtime check on every lookup.
+    auto_reload=False,
 )
 
 
+@lru_cache(maxsize=256)
+def _get_template(name: str):
+    return templates_env.get_template(name)
+
+
+def warm_template_cache() -> None:
+    """Load every page template once so no request pays the first compile."""
+    for root, _dirs, files in os.walk("templates"):
+        for filename in files:
+            if not filename.endswith(".html"):
+                continue
+            name = os.path.relpath(os.path.join(root, filename), "templates")
+            try:
+                _get_template(name.replace(os.sep, "/"))
+            except TemplateError:
+                logger.exception("Failed to preload template %s", name)
+
+
 @pass_context
 def _url_for(context: Dict[str, Any], name: str, /, **path_params: Any) -> str:
     request: Optional[Request] = context.get("request")
@@ -2119,12 +2504,47 @@ templates_env.globals.setdefault("url_for", _url_for)
 # -----------------------------------------------------------------------------
 
 bars: Dict[int, Bar] = {}
+# Reverse index of staff assignments: user id -> ids of bars where the user is
+# a bar admin or bartender. Maintained by ``Bar.add_staff``/``Bar.remove_staff``.
+bar_ids_by_staff: Dict[int, set[int]] = defaultdict(set)
+# Immutable copy of ``bars.values()`` handed to templates; rebuilt whenever a
+# bar is added to or removed from ``bars``.
+bars_snapshot: Tuple[Bar, ...] = ()
+
+
+def refresh_bars_snapshot() -> None:
+    global bars_snapshot
+    bars_snapshot = tuple(bars.values())
+
 
 # User storage
 users: Dict[int, DemoUser] = {}
 users_by_username: Dict[str, DemoUser] = {}
 users_by_email: Dict[str, DemoUser] = {}
-next_user_id = 1
+
+
+def cache_user(user: DemoUser) -> None:
+    """Register ``user`` in all three lookup tables under normalised keys."""
+    users[user.id] = user
+    users_by_username[user.username.lower()] = user
+    users_by_email[normalize_email(user.email)] = user
+
+
+# Mapping from in-memory role names to persisted role enum values
+ROLE_ENUM_MAP: Dict[str, RoleEnum] = {
+    "super_admin": RoleEnum.SUPERADMIN,
+    "bar_admin": RoleEnum.BARADMIN,
+    "bartender": RoleEnum.BARTENDER,
+    "customer": RoleEnum.CUSTOMER,
+    "display": RoleEnum.DISPLAY,
+    "blocked": RoleEnum.BLOCKED,
+    "ip_block": RoleEnum.IPBLOCK,
+}
+# Roles a bar's staff page may grant, and accounts it must never touch
+BAR_STAFF_ROLES: Dict[str, RoleEnum] = {
+    role: ROLE_ENUM_MAP[role] for role in ("bar_admin", "bartender", "display")
+}
+PROTECTED_STAFF_ROLES = frozenset({RoleEnum.SUPERADMIN, RoleEnum.FINANCE})
 
 # Blocked IP storage
 blocked_ips: Dict[int, BlockedIPEntry] = {}
@@ -2134,15 +2554,17 @@ blocked_ip_lookup: Dict[str, BlockedIPEntry] = {}
 USERNAME_REGEX = re.compile(
     r"^(?![._-])(?!.*[._-]{2})(?!.*[._-]$)[a-z0-9._-]{3,24}$"
 )
-RESERVED_USERNAMES = {
-    "admin",
-    "root",
-    "api",
-    "login",
-    "support",
-    "www",
-    "siplygo",
-}
+RESERVED_USERNAMES = frozenset(
+    {
+        "admin",
+        "root",
+        "api",
+        "login",
+        "support",
+        "www",
+        "siplygo",
+    }
+)
 USERNAME_MESSAGE = (
     "3–24 characters, lowercase letters, numbers, dot, hyphen or underscore. No spaces."
 )
@@ -2153,18 +2575,20 @@ user_carts: Dict[int, Cart] = {}
 # Password hashing
 PASSWORD_PEPPER = os.getenv("PASSWORD_PEPPER", "")
 ph = PasswordHasher(time_cost=3, memory_cost=65536, parallelism=2, hash_len=32, salt_len=16)
-WEAK_PASSWORDS = {
-    "12345678",
-    "password",
-    "qwerty",
-    "11111111",
-    "123456789",
-    "1234567890",
-    "iloveyou",
-    "admin",
-    "welcome",
-    "monkey",
-}
+WEAK_PASSWORDS = frozenset(
+    {
+        "12345678",
+        "password",
+        "qwerty",
+        "11111111",
+        "123456789",
+        "1234567890",
+        "iloveyou",
+        "admin",
+        "welcome",
+        "monkey",
+    }
+)
 
 
 def hash_password(password: str) -> str:
@@ -2178,7 +2602,7 @@ def verify_password(stored: str, password: str) -> bool:
         except argon2_exceptions.VerifyMismatchError:
             return False
     expected = hashlib.sha256((password + PASSWORD_PEPPER).encode("utf-8")).hexdigest()
-    return stored == expected
+    return hmac.compare_digest(stored.encode("utf-8"), expected.encode("utf-8"))
 
 
 def _client_from_trusted_proxy(client_host: Optional[str]) -> bool:
@@ -2347,10 +2771,28 @@ def get_user_by_id(user_id: Optional[int]) -> Optional[DemoUser]:
 
 
 def get_current_user(request: Request) -> Optional[DemoUser]:
-    return get_user_by_id(request.session.get("user_id"))
+    # Handlers and render_template both resolve the user; memoise it on the
+    # request so a cold or missing user costs at most one database lookup.
+    user_id = request.session.get("user_id")
+    cached = getattr(request.state, "current_user", None)
+    if cached is not None and cached[0] == user_id:
+        return cached[1]
+    user = get_user_by_id(user_id)
+    request.state.current_user = (user_id, user)
+    return user
+
+
+def require_super_admin(request: Request) -> DemoUser:
+    """Dependency returning the current super admin, or redirecting home."""
+    user = get_current_user(request)
+    if not user or not user.is_super_admin:
+        raise HTTPException(
+            status_code=status.HTTP_303_SEE_OTHER, headers={"Location": "/"}
+        )
+    return user
 
 
-def redirect_for_authenticated_user(user: DemoUser) -> RedirectResponse:
+def redirect_for_authenticated_user(user: DemoUser) -> Response:
     if user.is_blocked:
         target = "/blocked"
     elif user.is_ip_blocked:
@@ -2361,7 +2803,7 @@ def redirect_for_authenticated_user(user: DemoUser) -> RedirectResponse:
         target = f"/dashboard/bar/{user.bar_id}/orders"
     else:
         target = "/dashboard"
-    return RedirectResponse(url=target, status_code=status.HTTP_303_SEE_OTHER)
+    return see_other(target)
 
 
 
@@ -2374,37 +2816,55 @@ def get_cart_for_user(user: DemoUser) -> Cart:
     return cart
 
 
+def normalize_email(value: Optional[str]) -> str:
+    """Return the canonical form of ``value`` used as the ``users_by_email`` key."""
+    return (value or "").strip().lower()
+
+
 def slugify(value: str) -> str:
     """Convert a string to a simple slug."""
     return value.lower().replace(" ", "-")
 
 
-def is_open_now_from_hours(hours: Dict[str, Dict[str, str]]) -> bool:
-    """Determine if a bar should be open now based on its hours dict.
+def bar_local_now() -> datetime:
+    """Return the current time in the bars' timezone."""
+    return datetime.now(bar_timezone())
+
+
+@lru_cache(maxsize=1024)
+def _minutes_of_day(value: str) -> Optional[int]:
+    """Parse ``HH:MM`` into minutes after midnight, or ``None`` if malformed."""
+    try:
+        parsed = datetime.strptime(value, "%H:%M")
+    except ValueError:
+        return None
+    return parsed.hour * 60 + parsed.minute
+
+
+def is_open_now_from_hours(
+    hours: Dict[str, Dict[str, str]], now: Optional[datetime] = None
+) -> bool:
+    """Determine if a bar should be open at ``now`` based on its hours dict.
 
-    The current time is evaluated in the timezone specified by the
-    ``BAR_TIMEZONE`` environment variable (falling back to ``TZ`` if set).
-    If neither variable is defined the server's local timezone is used.
+    ``now`` defaults to :func:`bar_local_now`; listing pages pass one value for
+    every bar instead of reading the clock per bar.
     """
     if not isinstance(hours, dict):
         return False
-    tz_name = os.getenv("BAR_TIMEZONE") or os.getenv("TZ")
-    now = datetime.now(ZoneInfo(tz_name)) if tz_name else datetime.now()
-    day = str(now.weekday())
-    info = hours.get(day)
+    if now is None:
+        now = bar_local_now()
+    info = hours.get(str(now.weekday()))
     if not info:
         return False
     open_time = info.get("open")
     close_time = info.get("close")
     if not open_time or not close_time:
         return False
-    try:
-        start = datetime.strptime(open_time, "%H:%M").time()
-        end = datetime.strptime(close_time, "%H:%M").time()
-    except ValueError:
+    start = _minutes_of_day(open_time)
+    end = _minutes_of_day(close_time)
+    if start is None or end is None:
         return False
-    now_t = now.time()
-    return start <= now_t < end
+    return start <= now.hour * 60 + now.minute < end
 
 
 def auto_cancel_unprepared_orders_once(
@@ -2457,7 +2917,7 @@ def auto_close_bars_once(db: Session, now: datetime) -> None:
         if not bar.opening_hours:
             continue
         try:
-            hours = json.loads(bar.opening_hours)
+            hours = _parse_opening_hours(bar.opening_hours) or {}
             info = hours.get(day)
             if not info:
                 continue
@@ -2493,8 +2953,7 @@ async def auto_close_bars_worker() -> None:
     """Periodic task to automatically close bars after their closing time."""
     while True:
         try:
-            tz_name = os.getenv("BAR_TIMEZONE") or os.getenv("TZ")
-            now = datetime.now(ZoneInfo(tz_name)) if tz_name else datetime.now()
+            now = bar_local_now()
             with SessionLocal() as db:
                 auto_close_bars_once(db, now)
         except Exception:
@@ -2559,18 +3018,7 @@ def weekly_hours_list(
     return result
 
 
-def format_time(dt: Optional[datetime]) -> str:
-    """Format a UTC datetime to local YYYY-MM-DD HH:MM string using BAR_TIMEZONE/TZ."""
-    if not dt:
-        return ""
-    tz_name = os.getenv("BAR_TIMEZONE") or os.getenv("TZ")
-    tz = ZoneInfo(tz_name) if tz_name else None
-    dt = dt.replace(tzinfo=ZoneInfo("UTC"))
-    if tz:
-        dt = dt.astimezone(tz)
-    return dt.strftime("%Y-%m-%d %H:%M")
-
-templates_env.filters["format_time"] = format_time
+templates_env.filters.update(TEMPLATE_FILTERS)
 
 templates_env.globals.update(
     SUPPORT_EMAIL=SUPPORT_EMAIL,
@@ -2582,19 +3030,46 @@ templates_env.globals.update(
 )
 
 
-def is_bar_open_now(bar: BarModel) -> bool:
+@lru_cache(maxsize=1024)
+def _parse_opening_hours(raw: str) -> Optional[Dict[str, Dict[str, str]]]:
+    """Decode a stored ``opening_hours`` JSON string; callers must not mutate it."""
+    try:
+        hours = json.loads(raw)
+    except Exception:
+        return None
+    return hours if isinstance(hours, dict) else None
+
+
+def opening_hours_dict(raw: Optional[str]) -> Dict[str, Dict[str, str]]:
+    """Return a private copy of the decoded ``opening_hours`` column."""
+    return dict(_parse_opening_hours(raw) or {}) if raw else {}
+
+
+# (weekday key, open field, close field) for the bar forms' hour inputs
+_OPENING_HOURS_FIELDS = tuple((str(i), f"open_{i}", f"close_{i}") for i in range(7))
+
+
+def opening_hours_from_form(form: Any) -> Dict[str, Dict[str, str]]:
+    """Collect the weekdays that have both an opening and a closing time."""
+    hours = {}
+    for day, open_field, close_field in _OPENING_HOURS_FIELDS:
+        o = form.get(open_field)
+        c = form.get(close_field)
+        if o and c:
+            hours[day] = {"open": o, "close": c}
+    return hours
+
+
+def is_bar_open_now(bar: BarModel, now: Optional[datetime] = None) -> bool:
     """Determine if a bar is currently open considering manual closures."""
     if getattr(bar, "manual_closed", False):
         return False
     if not bar.opening_hours:
         return False
-    try:
-        hours = json.loads(bar.opening_hours)
-    except Exception:
-        return False
-    if not isinstance(hours, dict):
+    hours = _parse_opening_hours(bar.opening_hours)
+    if hours is None:
         return False
-    return is_open_now_from_hours(hours)
+    return is_open_now_from_hours(hours, now)
 
 
 def load_bars_from_db() -> None:
@@ -2602,13 +3077,23 @@ def load_bars_from_db() -> None:
     db = SessionLocal()
     try:
         bars.clear()
-        for b in db.query(BarModel).all():
-            try:
-                hours = json.loads(b.opening_hours) if b.opening_hours else {}
-                if not isinstance(hours, dict):
-                    hours = {}
-            except Exception:
-                hours = {}
+        bar_ids_by_staff.clear()
+        now = bar_local_now()
+        # Collections and staff rows are fetched in batches, not once per bar
+        db_bars = (
+            db.query(BarModel)
+            .options(
+                selectinload(BarModel.categories),
+                selectinload(BarModel.menu_items),
+                selectinload(BarModel.tables),
+            )
+            .all()
+        )
+        roles_by_bar: Dict[int, List[UserBarRole]] = defaultdict(list)
+        for r in db.query(UserBarRole).all():
+            roles_by_bar[r.bar_id].append(r)
+        for b in db_bars:
+            hours = opening_hours_dict(b.opening_hours)
             translations = dict(b.description_translations or {})
             base_description = (
                 translations.get(DEFAULT_LANGUAGE)
@@ -2629,7 +3114,7 @@ def load_bars_from_db() -> None:
                 description_translations=translations,
                 photo_url=b.photo_url,
                 rating=b.rating or 0.0,
-                is_open_now=is_open_now_from_hours(hours)
+                is_open_now=is_open_now_from_hours(hours, now)
                 and not (b.manual_closed or False),
                 manual_closed=b.manual_closed or False,
                 ordering_paused=b.ordering_paused or False,
@@ -2690,13 +3175,9 @@ def load_bars_from_db() -> None:
                     id=t.id, name=t.name, description=t.description or ""
                 )
             # Load user assignments
-            bar.bar_admin_ids = []
-            bar.bartender_ids = []
-            bar.pending_bartender_ids = []
-            roles = db.query(UserBarRole).filter(UserBarRole.bar_id == b.id).all()
-            for r in roles:
+            for r in roles_by_bar.get(b.id, ()):
                 if r.role == RoleEnum.BARADMIN:
-                    bar.bar_admin_ids.append(r.user_id)
+                    bar.add_staff(r.user_id, "bar_admin")
                     if r.user_id in users:
                         user_obj = users[r.user_id]
                         if b.id not in user_obj.bar_ids:
@@ -2704,7 +3185,7 @@ def load_bars_from_db() -> None:
                         user_obj.role = "bar_admin"
                         user_obj.base_role = "bar_admin"
                 elif r.role == RoleEnum.BARTENDER:
-                    bar.bartender_ids.append(r.user_id)
+                    bar.add_staff(r.user_id, "bartender")
                     if r.user_id in users:
                         user_obj = users[r.user_id]
                         if b.id not in user_obj.bar_ids:
@@ -2712,6 +3193,7 @@ def load_bars_from_db() -> None:
                         user_obj.role = "bartender"
                         user_obj.base_role = "bartender"
             bars[b.id] = bar
+        refresh_bars_snapshot()
     finally:
         db.close()
 
@@ -2737,17 +3219,21 @@ def load_blocked_ips_from_db() -> None:
 
 def refresh_bar_from_db(bar_id: int, db: Session) -> Optional[Bar]:
     """Reload a single bar with its categories and products from the database."""
-    b = db.get(BarModel, bar_id)
+    b = (
+        db.query(BarModel)
+        .options(
+            selectinload(BarModel.categories),
+            selectinload(BarModel.menu_items),
+            selectinload(BarModel.tables),
+        )
+        .filter(BarModel.id == bar_id)
+        .first()
+    )
     if not b:
         return None
     bar = bars.get(bar_id)
     if not bar:
-        try:
-            hours = json.loads(b.opening_hours) if b.opening_hours else {}
-            if not isinstance(hours, dict):
-                hours = {}
-        except Exception:
-            hours = {}
+        hours = opening_hours_dict(b.opening_hours)
         translations = dict(b.description_translations or {})
         base_description = (
             translations.get(DEFAULT_LANGUAGE)
@@ -2775,11 +3261,13 @@ def refresh_bar_from_db(bar_id: int, db: Session) -> Optional[Bar]:
             opening_hours=hours,
         )
         bars[bar_id] = bar
+        refresh_bars_snapshot()
     else:
         bar.name = b.name
         bar.address = b.address or ""
         bar.city = b.city or ""
         bar.state = b.state or ""
+        bar.search_blob = bar_search_blob(bar.name, bar.address, bar.city, bar.state)
         bar.latitude = float(b.latitude) if b.latitude is not None else 0.0
         bar.longitude = float(b.longitude) if b.longitude is not None else 0.0
         translations = dict(b.description_translations or {})
@@ -2794,12 +3282,7 @@ def refresh_bar_from_db(bar_id: int, db: Session) -> Optional[Bar]:
         bar.description_translations = translations
         bar.photo_url = b.photo_url
         bar.rating = b.rating or 0.0
-        try:
-            hours = json.loads(b.opening_hours) if b.opening_hours else {}
-            if not isinstance(hours, dict):
-                hours = {}
-        except Exception:
-            hours = {}
+        hours = opening_hours_dict(b.opening_hours)
         bar.opening_hours = hours
         bar.manual_closed = b.manual_closed or False
         bar.ordering_paused = b.ordering_paused or False
@@ -2807,6 +3290,7 @@ def refresh_bar_from_db(bar_id: int, db: Session) -> Optional[Bar]:
         bar.categories.clear()
         bar.products.clear()
         bar.tables.clear()
+        bar.invalidate_menu()
     for c in b.categories:
         name_translations = normalise_translation_map(
             c.name_translations, c.name or ""
@@ -2856,19 +3340,17 @@ def refresh_bar_from_db(bar_id: int, db: Session) -> Optional[Bar]:
     for t in b.tables:
         bar.tables[t.id] = Table(id=t.id, name=t.name, description=t.description or "")
     # Load user assignments
-    bar.bar_admin_ids = []
-    bar.bartender_ids = []
-    bar.pending_bartender_ids = []
+    bar.clear_staff()
     roles = db.query(UserBarRole).filter(UserBarRole.bar_id == bar_id).all()
     for r in roles:
         if r.role == RoleEnum.BARADMIN:
-            bar.bar_admin_ids.append(r.user_id)
+            bar.add_staff(r.user_id, "bar_admin")
             if r.user_id in users:
                 if bar_id not in users[r.user_id].bar_ids:
                     users[r.user_id].bar_ids.append(bar_id)
                 users[r.user_id].role = "bar_admin"
         elif r.role == RoleEnum.BARTENDER:
-            bar.bartender_ids.append(r.user_id)
+            bar.add_staff(r.user_id, "bartender")
             if r.user_id in users:
                 if bar_id not in users[r.user_id].bar_ids:
                     users[r.user_id].bar_ids.append(bar_id)
@@ -2876,15 +3358,24 @@ def refresh_bar_from_db(bar_id: int, db: Session) -> Optional[Bar]:
     return bar
 
 
+def _public_base_prefix(request: Request) -> str:
+    """Return the public base URL with a trailing slash, resolved once per request."""
+    prefix = getattr(request.state, "public_base_prefix", None)
+    if prefix is None:
+        prefix = get_public_base_url(request).rstrip("/") + "/"
+        request.state.public_base_prefix = prefix
+    return prefix
+
+
 def make_absolute_url(url: Optional[str], request: Request) -> Optional[str]:
     if not url:
         return None
+    if url.startswith("https://"):
+        return url
     if url.startswith("http://"):
-        url = "https://" + url[len("http://") :]
-    elif not url.startswith("https://"):
-        base = get_public_base_url(request).rstrip("/")
-        url = urljoin(f"{base}/", url.lstrip("/"))
-    return url
+        return "https://" + url[len("http://") :]
+    # Stored photo URLs are plain site paths, so joining is a concatenation.
+    return _public_base_prefix(request) + url.lstrip("/")
 
 
 async def save_upload(
@@ -2902,7 +3393,35 @@ async def save_upload(
     return await save_product_image(file)
 
 
-def render_template(template_name: str, **context) -> HTMLResponse:
+@lru_cache(maxsize=64)
+def _location_header(url: str) -> tuple[bytes, bytes]:
+    return (b"location", quote(url, safe=":/%#?=@[]!$&'()*+,;").encode("latin-1"))
+
+
+def see_other(url: str) -> Response:
+    """Return a 303 redirect to ``url``.
+
+    Equivalent to ``RedirectResponse(url, 303)`` but the encoded ``Location``
+    header is cached per target. A new response is still built per call since
+    middleware appends headers (e.g. the session cookie) to it.
+    """
+    response = Response(status_code=status.HTTP_303_SEE_OTHER)
+    response.raw_headers.append(_location_header(url))
+    return response
+
+
+# Only these pages show the "recently visited" strip; others skip the lookup.
+RECENT_BARS_TEMPLATES = frozenset({"home.html", "search.html"})
+
+
+def render_template(
+    template_name: str, *, db: Optional[Session] = None, **context
+) -> HTMLResponse:
+    """Render ``template_name`` with the shared layout context.
+
+    Pass the handler's ``db`` session to reuse it for the header and
+    recently-visited lookups instead of checking out another connection.
+    """
     status_code = context.pop("status_code", 200)
     request: Optional[Request] = context.get("request")
     user = context.get("user")
@@ -2917,7 +3436,7 @@ def render_template(template_name: str, **context) -> HTMLResponse:
             cart = get_cart_for_user(user)
             context.setdefault(
                 "cart_count",
-                sum(item.quantity for item in cart.items.values()),
+                cart.count,
             )
             if cart.bar_id:
                 bar = bars.get(cart.bar_id)
@@ -2925,38 +3444,49 @@ def render_template(template_name: str, **context) -> HTMLResponse:
                     context.setdefault("cart_bar_id", bar.id)
                     context.setdefault("cart_bar_name", bar.name)
                     context.setdefault("cart_bar_paused", bar.ordering_paused)
-            with SessionLocal() as db:
+            with nullcontext(db) if db is not None else SessionLocal() as session:
                 unread_count = (
-                    db.query(Notification)
+                    session.query(func.count(Notification.id))
                     .filter(
                         Notification.user_id == user.id,
                         Notification.read.is_(False),
                     )
-                    .count()
+                    .scalar()
                 )
                 context.setdefault("unread_notifications", unread_count)
     if request is not None:
         bar_obj = context.get("bar")
         if bar_obj and hasattr(bar_obj, "id"):
             context.setdefault("current_bar_id", bar_obj.id)
-        recent_ids = request.session.get("recent_bar_ids", [])
+        recent_ids = (
+            request.session.get("recent_bar_ids", [])
+            if template_name in RECENT_BARS_TEMPLATES
+            else None
+        )
         if recent_ids:
-            with SessionLocal() as db:
-                recent_bars = []
-                for bar_id in reversed(recent_ids):
-                    bar = db.get(BarModel, bar_id)
-                    if bar:
-                        bar.photo_url = make_absolute_url(bar.photo_url, request)
-                        bar.is_open_now = is_bar_open_now(bar)
-                        _ = bar.categories  # preload categories for search filters
-                        recent_bars.append(bar)
+            with nullcontext(db) if db is not None else SessionLocal() as session:
+                recent_by_id = {
+                    bar.id: bar
+                    for bar in session.query(BarModel)
+                    .filter(BarModel.id.in_(recent_ids))
+                    .all()
+                }
+                recent_bars = bar_cards(
+                    (
+                        recent_by_id[bar_id]
+                        for bar_id in reversed(recent_ids)
+                        if bar_id in recent_by_id
+                    ),
+                    request,
+                )
                 context.setdefault("recent_bars", recent_bars)
 
     language_code = DEFAULT_LANGUAGE
-    translator = create_translator(DEFAULT_LANGUAGE)
     if request is not None:
         translator = translator_for_request(request)
         language_code = getattr(request.state, "language_code", DEFAULT_LANGUAGE)
+    else:
+        translator = create_translator(DEFAULT_LANGUAGE)
 
     context.setdefault("language_code", language_code)
     context.setdefault("available_languages", available_languages())
@@ -3009,7 +3539,7 @@ def render_template(template_name: str, **context) -> HTMLResponse:
     context.setdefault("product_name", _product_name_helper)
     context.setdefault("product_description", _product_description_helper)
 
-    template = templates_env.get_template(template_name)
+    template = _get_template(template_name)
     return HTMLResponse(template.render(**context), status_code=status_code)
 
 
@@ -3018,6 +3548,28 @@ def render_template(template_name: str, **context) -> HTMLResponse:
 # -----------------------------------------------------------------------------
 
 
+HEALTHCHECK_TTL_SECONDS = 5.0
+_healthcheck_last_ok = 0.0
+
+
+@app.get("/healthz")
+def healthz():
+    """Liveness probe that pings the database at most once per TTL window."""
+    global _healthcheck_last_ok
+    now = time.monotonic()
+    if now - _healthcheck_last_ok > HEALTHCHECK_TTL_SECONDS:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception:
+            logger.exception("Health check database ping failed")
+            return JSONResponse(
+                {"status": "error"}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        _healthcheck_last_ok = now
+    return JSONResponse({"status": "ok"})
+
+
 @app.post("/api/products/{product_id}/image")
 async def upload_product_image(
     request: Request,
@@ -3102,13 +3654,10 @@ def get_product_image(
 
 
 @app.get("/", response_class=HTMLResponse)
-async def home(request: Request, db: Session = Depends(get_db)):
+def home(request: Request, db: Session = Depends(get_db)):
     """Home page listing available bars."""
-    db_bars = db.query(BarModel).all()
-    for bar in db_bars:
-        bar.photo_url = make_absolute_url(bar.photo_url, request)
-        bar.is_open_now = is_bar_open_now(bar)
-    return render_template("home.html", request=request, bars=db_bars)
+    db_bars = bar_cards(db.query(BarModel).all(), request)
+    return render_template("home.html", db=db, request=request, bars=db_bars)
 
 
 @app.get("/about", response_class=HTMLResponse)
@@ -3139,22 +3688,49 @@ async def terms(request: Request):
     return render_template("terms.html", request=request)
 
 
+def _haversine_from(lat1: float, lon1: float) -> Callable[[float, float], float]:
+    """Return a function giving the distance in kilometers from a fixed point.
+
+    The origin's radians and cosine are computed once, so listing pages only pay
+    for the per-bar terms.
+    """
+    lat1_r = math.radians(lat1)
+    lon1_r = math.radians(lon1)
+    cos_lat1 = math.cos(lat1_r)
+
+    def distance(lat2: float, lon2: float) -> float:
+        lat2_r = math.radians(lat2)
+        a = (
+            math.sin((lat2_r - lat1_r) / 2) ** 2
+            + cos_lat1
+            * math.cos(lat2_r)
+            * math.sin((math.radians(lon2) - lon1_r) / 2) ** 2
+        )
+        return 6371 * 2 * math.asin(math.sqrt(a))
+
+    return distance
+
+
 def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """Calculate distance in kilometers between two lat/lon points."""
-    from math import asin, cos, radians, sin, sqrt
+    return _haversine_from(lat1, lon1)(lat2, lon2)
 
-    dlat = radians(lat2 - lat1)
-    dlon = radians(lon2 - lon1)
-    a = (
-        sin(dlat / 2) ** 2
-        + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
-    )
-    c = 2 * asin(sqrt(a))
-    return 6371 * c
+
+def _reservoir_sample(items: Iterable[Any], k: int) -> List[Any]:
+    """Pick up to ``k`` items uniformly at random in a single pass."""
+    reservoir: List[Any] = []
+    for seen, item in enumerate(items):
+        if seen < k:
+            reservoir.append(item)
+        else:
+            j = random.randint(0, seen)
+            if j < k:
+                reservoir[j] = item
+    return reservoir
 
 
 @app.get("/search", response_class=HTMLResponse)
-async def search_bars(
+def search_bars(
     request: Request,
     q: str = "",
     lat: float | None = None,
@@ -3162,47 +3738,38 @@ async def search_bars(
     db: Session = Depends(get_db),
 ):
     term = q.lower()
-    db_bars = db.query(BarModel).all()
-    for bar in db_bars:
-        bar.photo_url = make_absolute_url(bar.photo_url, request)
-        bar.is_open_now = is_bar_open_now(bar)
-        if (
-            lat is not None
-            and lng is not None
-            and bar.latitude is not None
-            and bar.longitude is not None
-        ):
-            bar.distance_km = _haversine_km(
-                float(lat), float(lng), float(bar.latitude), float(bar.longitude)
-            )
-        else:
-            bar.distance_km = None
-    results = [
-        bar
-        for bar in db_bars
-        if term in (bar.name or "").lower()
-        or term in (bar.address or "").lower()
-        or term in (bar.city or "").lower()
-        or term in (bar.state or "").lower()
-    ]
+    distance_from_user = (
+        _haversine_from(lat, lng) if lat is not None and lng is not None else None
+    )
+    db_bars = bar_cards(db.query(BarModel).all(), request, distance_from_user)
+    if term:
+        results = []
+        for bar in db_bars:
+            # Match on the row just read rather than the in-memory mirror,
+            # which can lag behind a rename made by another worker.
+            if term in bar_search_blob(bar.name, bar.address, bar.city, bar.state):
+                results.append(bar)
+    else:
+        results = list(db_bars)
     # Determine a random selection of open bars within 20km for the "Recommended" section.
     if lat is not None and lng is not None:
-        nearby_pool = [
+        nearby_pool = (
             b
             for b in db_bars
             if b.is_open_now and b.distance_km is not None and b.distance_km <= 20
-        ]
+        )
     else:
-        nearby_pool = [b for b in db_bars if b.is_open_now]
-    recommended_bars = random.sample(nearby_pool, min(5, len(nearby_pool)))
+        nearby_pool = (b for b in db_bars if b.is_open_now)
+    recommended_bars = _reservoir_sample(nearby_pool, 5)
     if lat is not None and lng is not None:
         rated_within = [
             b
             for b in results
             if b.rating is not None and b.distance_km is not None and b.distance_km <= 5
         ]
-        rated_within.sort(key=lambda b: (-b.rating, b.distance_km))
-        top_bars = rated_within[:5]
+        top_bars = heapq.nsmallest(
+            5, rated_within, key=lambda b: (-b.rating, b.distance_km)
+        )
         top_bars_message = None
         if not top_bars:
             top_bars_message = "No bars near you."
@@ -3210,18 +3777,19 @@ async def search_bars(
         results.sort(key=lambda b: (b.distance_km is None, b.distance_km))
     else:
         rated = [b for b in results if b.rating is not None]
-        rated.sort(key=lambda b: -b.rating)
-        top_bars = rated[:5]
+        top_bars = heapq.nsmallest(5, rated, key=lambda b: -b.rating)
         if len(top_bars) < 5:
             others = [b for b in results if b not in top_bars]
-            others.sort(key=lambda b: (b.name or ""))
-            top_bars.extend(others[: 5 - len(top_bars)])
+            top_bars.extend(
+                heapq.nsmallest(5 - len(top_bars), others, key=lambda b: (b.name or ""))
+            )
         top_bars_message = None
         # Default to alphabetical order when distance is unavailable
         results.sort(key=lambda b: (b.name or "").lower())
 
     return render_template(
         "search.html",
+        db=db,
         request=request,
         bars=results,
         top_bars=top_bars,
@@ -3232,31 +3800,38 @@ async def search_bars(
 
 
 @app.get("/bars", response_class=HTMLResponse)
-async def list_all_bars(
+def list_all_bars(
     request: Request,
     lat: float | None = None,
     lng: float | None = None,
     db: Session = Depends(get_db),
 ):
-    db_bars = db.query(BarModel).order_by(BarModel.id).all()
-    for bar in db_bars:
-        bar.photo_url = make_absolute_url(bar.photo_url, request)
-        bar.is_open_now = is_bar_open_now(bar)
-        if (
-            lat is not None
-            and lng is not None
-            and bar.latitude is not None
-            and bar.longitude is not None
-        ):
-            bar.distance_km = _haversine_km(
-                float(lat), float(lng), float(bar.latitude), float(bar.longitude)
-            )
-        else:
-            bar.distance_km = None
+    distance_from_user = (
+        _haversine_from(lat, lng) if lat is not None and lng is not None else None
+    )
+    db_bars = bar_cards(
+        db.query(BarModel).order_by(BarModel.id).all(), request, distance_from_user
+    )
     return render_template("all_bars.html", request=request, bars=db_bars)
 
 
-@app.get("/api/search")
+class BarSearchResult(BaseModel):
+    id: int
+    name: str
+    address: str
+    city: str
+    state: str
+    description: Optional[str] = None
+    photo_url: Optional[str] = None
+
+
+class BarSearchResponse(BaseModel):
+    bars: List[BarSearchResult]
+
+
+# Declaring the response model lets FastAPI serialise through pydantic-core
+# instead of walking the payload with ``jsonable_encoder`` first.
+@app.get("/api/search", response_model=BarSearchResponse)
 async def api_search(q: str = "", request: Request = None):
     term = q.lower()
     results = [
@@ -3272,10 +3847,7 @@ async def api_search(q: str = "", request: Request = None):
             ),
         }
         for bar in bars.values()
-        if term in bar.name.lower()
-        or term in bar.address.lower()
-        or term in bar.city.lower()
-        or term in bar.state.lower()
+        if not term or term in bar.search_blob
     ]
     return {"bars": results}
 
@@ -3386,6 +3958,18 @@ class RegisterIn(BaseModel):
     model_config = ConfigDict(extra="ignore")
 
 
+@lru_cache(maxsize=4096)
+def validate_phone_cached(prefix: Optional[str], phone: str) -> Tuple[str, str]:
+    """Validate ``prefix``/``phone`` and return ``(phone_e164, phone_region)``.
+
+    Raises ``ValidationError`` for malformed input and ``HTTPException`` when the
+    number cannot be normalised. Successful results are memoised so re-editing a
+    user with an unchanged number skips pydantic and libphonenumber.
+    """
+    RegisterIn.model_validate({"dial_code": prefix, "phone": phone})
+    return normalize_phone_or_raise(prefix or "", phone)
+
+
 class AuthRegister(BaseModel):
     email: str
 
@@ -3412,8 +3996,9 @@ class PayoutRead(BaseModel):
 def list_bars(db: Session = Depends(get_db)):
     """Return all bars stored in the database."""
     bars = db.query(BarModel).all()
+    now = bar_local_now()
     for b in bars:
-        b.is_open_now = is_bar_open_now(b)
+        b.is_open_now = is_bar_open_now(b, now)
     return bars
 
 
@@ -3457,7 +4042,7 @@ def create_bar(
             detail="Not authorised",
         )
 
-    payload = data.dict()
+    payload = data.model_dump()
     translations = payload.get("description_translations") or {}
     description = payload.get("description")
     if description and not translations:
@@ -3557,19 +4142,34 @@ async def create_order(
     subtotal = Decimal("0.00")
     vat_total = Decimal("0.00")
     order_items: List[OrderItem] = []
+    menu_items_by_id = {
+        menu_item.id: menu_item
+        for menu_item in db.query(MenuItem)
+        .filter(MenuItem.id.in_(set(menu_item_ids)))
+        .all()
+    }
+    # (unit price, unit VAT) per menu item, so repeated lines reuse the math
+    unit_amounts: Dict[int, Tuple[Decimal, Decimal]] = {}
 
     for item in order.items:
         if item.qty <= 0:
             raise HTTPException(status_code=400, detail="Invalid quantity")
-        menu_item = db.get(MenuItem, item.menu_item_id)
+        menu_item = menu_items_by_id.get(item.menu_item_id)
         if not menu_item:
             raise HTTPException(status_code=404, detail="Menu item not found")
         if menu_item.bar_id != order.bar_id:
             raise HTTPException(status_code=400, detail="Menu item does not belong to bar")
-        price = Decimal(menu_item.price_chf)
-        vat_rate = Decimal(menu_item.vat_rate or 0)
+        unit = unit_amounts.get(menu_item.id)
+        if unit is None:
+            # Numeric columns already load as Decimal; no re-wrapping needed.
+            price = menu_item.price_chf
+            unit = unit_amounts[menu_item.id] = (
+                price,
+                calculate_vat_from_gross(price, menu_item.vat_rate or Decimal(0)),
+            )
+        price, unit_vat = unit
         line_total = price * item.qty
-        line_vat = calculate_vat_from_gross(price, vat_rate) * item.qty
+        line_vat = unit_vat * item.qty
         vat_total += line_vat
         subtotal += line_total - line_vat
         order_items.append(
@@ -3769,24 +4369,13 @@ async def bar_detail(request: Request, bar_id: int):
         raise HTTPException(status_code=404, detail="Bar not found")
     bar.photo_url = make_absolute_url(bar.photo_url, request)
     bar.distance_km = None
-    # group products by category
-    products_by_category: Dict[Category, List[Product]] = {}
     for prod in bar.products.values():
         prod.photo_url = make_absolute_url(prod.photo_url, request)
-        category = bar.categories.get(prod.category_id)
-        if not category:
-            continue
-        products_by_category.setdefault(category, []).append(prod)
-    for prods in products_by_category.values():
-        prods.sort(key=lambda p: p.display_order)
-    sorted_products = sorted(
-        products_by_category.items(), key=lambda kv: kv[0].display_order
-    )
     return render_template(
         "bar_detail.html",
         request=request,
         bar=bar,
-        products_by_category=sorted_products,
+        products_by_category=bar.products_by_category(),
         opening_hours=weekly_hours_list(bar.opening_hours) if bar.opening_hours else [],
         pause_popup_close=bar.ordering_paused,
         cart_bar_name=bar.name,
@@ -3800,13 +4389,9 @@ async def track_recent_bar(request: Request, bar_id: int):
     if not bar:
         raise HTTPException(status_code=404, detail="Bar not found")
     await enforce_csrf(request)
-    recent = list(request.session.get("recent_bar_ids", []))
-    if bar.id in recent:
-        recent.remove(bar.id)
-    recent.append(bar.id)
-    if len(recent) > 5:
-        recent = recent[-5:]
-    request.session["recent_bar_ids"] = recent
+    # Most recent last, capped at five, built in one pass.
+    recent = [bid for bid in request.session.get("recent_bar_ids", []) if bid != bar.id]
+    request.session["recent_bar_ids"] = recent[-4:] + [bar.id]
     return JSONResponse({"status": "ok"})
 
 
@@ -3815,7 +4400,7 @@ async def add_to_cart(request: Request, bar_id: int, product_id: int = Form(...)
     """Add a product to the cart from a submitted form."""
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/login")
     await enforce_csrf(request)
     translator = translator_for_request(request)
     bar = bars.get(bar_id)
@@ -3830,12 +4415,6 @@ async def add_to_cart(request: Request, bar_id: int, product_id: int = Form(...)
         raise HTTPException(status_code=404, detail="Product not found")
     cart = get_cart_for_user(user)
     if cart.bar_id and cart.bar_id != bar_id:
-        products_by_category: Dict[Category, List[Product]] = {}
-        for prod in bar.products.values():
-            category = bar.categories.get(prod.category_id)
-            if not category:
-                continue
-            products_by_category.setdefault(category, []).append(prod)
         error_message = translator(
             "cart.errors.other_bar",
             default="Please clear your cart before ordering from another bar.",
@@ -3844,7 +4423,7 @@ async def add_to_cart(request: Request, bar_id: int, product_id: int = Form(...)
             "bar_detail.html",
             request=request,
             bar=bar,
-            products_by_category=products_by_category,
+            products_by_category=bar.products_by_category(),
             error=error_message,
             pause_popup_close=bar.ordering_paused,
             cart_bar_name=bar.name,
@@ -3855,7 +4434,7 @@ async def add_to_cart(request: Request, bar_id: int, product_id: int = Form(...)
     cart.add(product)
     save_cart_for_user(user.id, cart)
     if "application/json" in request.headers.get("accept", ""):
-        count = sum(item.quantity for item in cart.items.values())
+        count = cart.count
         total = cart.total_with_fee()
         language_code = getattr(request.state, "language_code", DEFAULT_LANGUAGE)
         items = [
@@ -3871,23 +4450,21 @@ async def add_to_cart(request: Request, bar_id: int, product_id: int = Form(...)
         return JSONResponse(
             {"count": count, "totalFormatted": f"CHF {total:.2f}", "items": items}
         )
-    return RedirectResponse(
-        url=f"/bars/{bar_id}", status_code=status.HTTP_303_SEE_OTHER
-    )
+    return see_other(f"/bars/{bar_id}")
 
 
 @app.get("/cart", response_class=HTMLResponse)
 async def view_cart(request: Request):
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/login")
     cart = get_cart_for_user(user)
     current_bar: Optional[Bar] = bars.get(cart.bar_id) if cart.bar_id else None
     if current_bar and cart.table_id not in current_bar.tables:
         cart.table_id = None
         save_cart_for_user(user.id, cart)
     if "application/json" in request.headers.get("accept", ""):
-        count = sum(item.quantity for item in cart.items.values())
+        count = cart.count
         total = cart.total_with_fee()
         language_code = getattr(request.state, "language_code", DEFAULT_LANGUAGE)
         items = [
@@ -3918,14 +4495,14 @@ async def clear_cart(request: Request):
     """Remove all items from the user's cart."""
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/login")
     await enforce_csrf(request)
     cart = get_cart_for_user(user)
     cart.clear()
     save_cart_for_user(user.id, cart)
     if "application/json" in request.headers.get("accept", ""):
         return JSONResponse({"cleared": True})
-    return RedirectResponse(url="/cart", status_code=status.HTTP_303_SEE_OTHER)
+    return see_other("/cart")
 
 
 @app.post("/cart/update")
@@ -3935,13 +4512,13 @@ async def update_cart(
     """Update item quantity or remove an item in the cart."""
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/login")
     await enforce_csrf(request)
     cart = get_cart_for_user(user)
     cart.update_quantity(product_id, quantity)
     save_cart_for_user(user.id, cart)
     if "application/json" in request.headers.get("accept", ""):
-        count = sum(item.quantity for item in cart.items.values())
+        count = cart.count
         total = cart.total_with_fee()
         language_code = getattr(request.state, "language_code", DEFAULT_LANGUAGE)
         items = [
@@ -3957,7 +4534,7 @@ async def update_cart(
         return JSONResponse(
             {"count": count, "totalFormatted": f"CHF {total:.2f}", "items": items}
         )
-    return RedirectResponse(url="/cart", status_code=status.HTTP_303_SEE_OTHER)
+    return see_other("/cart")
 
 
 def _ensure_table_for_cart(cart: Cart, table_id: int) -> None:
@@ -3972,7 +4549,7 @@ def _ensure_table_for_cart(cart: Cart, table_id: int) -> None:
 async def select_table(request: Request, table_id: str = Form(...)):
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/login")
     await enforce_csrf(request)
     try:
         parsed_table_id = int(table_id)
@@ -3984,7 +4561,7 @@ async def select_table(request: Request, table_id: str = Form(...)):
     save_cart_for_user(user.id, cart)
     if "application/json" in request.headers.get("accept", ""):
         return JSONResponse({"table_id": parsed_table_id})
-    return RedirectResponse(url="/cart", status_code=status.HTTP_303_SEE_OTHER)
+    return see_other("/cart")
 
 
 @app.post("/cart/checkout")
@@ -3998,7 +4575,7 @@ async def checkout(
     user = get_current_user(request)
     translator = translator_for_request(request)
     if not user:
-        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/login")
     await enforce_csrf(request)
     cart = get_cart_for_user(user)
     if table_id is not None:
@@ -4028,7 +4605,7 @@ async def checkout(
                 "noticeType": "error",
             }
             url = "/cart?" + urlencode(params)
-            return RedirectResponse(url=url, status_code=status.HTTP_303_SEE_OTHER)
+            return see_other(url)
         user.credit -= order_total
         db_user = db.query(User).filter(User.id == user.id).first()
         if db_user:
@@ -4124,9 +4701,9 @@ async def checkout(
                 space_id=wallee_client.space_id, id=int(tx.id)
             )
             save_cart_for_user(user.id, cart)
-            return RedirectResponse(url=page_url, status_code=status.HTTP_303_SEE_OTHER)
+            return see_other(page_url)
         except ApiException:
-            return RedirectResponse(url=failed_url, status_code=status.HTTP_303_SEE_OTHER)
+            return see_other(failed_url)
     now = datetime.utcnow()
     local_date, seq, code = generate_public_order_code(db, cart.bar_id, now)
     db_order = Order(
@@ -4169,8 +4746,7 @@ async def checkout(
             }
             for item in cart.items.values()
         ]
-        user.transactions.insert(
-            0,
+        user.add_transaction(
             Transaction(
                 bar.id,
                 bar.name,
@@ -4180,6 +4756,7 @@ async def checkout(
                 order_id=db_order.id,
                 status="PROCESSING",
             ),
+            newest=True,
         )
         db.add(
             WalletTransaction(
@@ -4198,7 +4775,7 @@ async def checkout(
         db.commit()
     cart.clear()
     save_cart_for_user(user.id, cart)
-    return RedirectResponse(url="/orders", status_code=status.HTTP_303_SEE_OTHER)
+    return see_other("/orders")
 
 
 # -----------------------------------------------------------------------------
@@ -4210,7 +4787,7 @@ async def checkout(
 async def order_history(request: Request, db: Session = Depends(get_db)):
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/login")
     orders = (
         db.query(Order)
         .filter(Order.customer_id == user.id)
@@ -4240,7 +4817,7 @@ async def reorder_order(
 ):
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/login")
     await enforce_csrf(request)
     order = db.get(Order, order_id)
     if not order or order.customer_id != user.id:
@@ -4270,16 +4847,15 @@ async def reorder_order(
     if missing_items or not desired_items:
         if "application/json" in request.headers.get("accept", ""):
             return JSONResponse({"error": "items_unavailable"}, status_code=409)
-        return RedirectResponse(url="/orders", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/orders")
     cart = get_cart_for_user(user)
-    cart.items.clear()
-    cart.items.update(desired_items)
+    cart.replace_items(desired_items)
     cart.bar_id = bar.id
     cart.table_id = None
     save_cart_for_user(user.id, cart)
     if "application/json" in request.headers.get("accept", ""):
         return JSONResponse({"redirect": "/cart"})
-    return RedirectResponse(url="/cart", status_code=status.HTTP_303_SEE_OTHER)
+    return see_other("/cart")
 
 
 @app.get(
@@ -4301,8 +4877,15 @@ async def get_bar_orders(
         )
     ):
         raise HTTPException(status_code=403, detail="Not authorised")
+    # Dashboards poll this endpoint; load everything the response model reads
+    # up front instead of lazily per order and per line.
     orders = (
         db.query(Order)
+        .options(
+            selectinload(Order.items).joinedload(OrderItem.menu_item),
+            joinedload(Order.customer),
+            joinedload(Order.table),
+        )
         .filter(Order.bar_id == bar_id, Order.closing_id.is_(None))
         .order_by(Order.created_at.desc())
         .all()
@@ -4425,7 +5008,7 @@ async def ws_user_orders(websocket: WebSocket, user_id: int):
 async def wallet(request: Request):
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/login")
     transactions = [
         tx for tx in user.transactions if getattr(tx, "payment_method", "") != "bar"
     ]
@@ -4442,7 +5025,7 @@ async def wallet(request: Request):
 async def topup(request: Request):
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/login")
     return render_template(
         "topup.html", request=request, cart_bar_id=None, cart_bar_name=None
     )
@@ -4462,7 +5045,7 @@ async def topup_success(request: Request, topup: str):
         "noticeType": "success",
     }
     url = "/wallet?" + urlencode(params)
-    return RedirectResponse(url, status_code=303)
+    return see_other(url)
 
 
 @app.get("/wallet/topup/failed")
@@ -4480,7 +5063,7 @@ async def topup_failed(request: Request, topup: str):
         "noticeType": "error",
     }
     url = "/wallet?" + urlencode(params)
-    return RedirectResponse(url, status_code=303)
+    return see_other(url)
 
 
 class TopupRequest(BaseModel):
@@ -4651,7 +5234,7 @@ async def register_step_one(request: Request, db: Session = Depends(get_db)):
         return redirect_for_authenticated_user(user)
     await enforce_csrf(request)
     form = await request.form()
-    email = form.get("email") or ""
+    email = normalize_email(form.get("email"))
     password = form.get("password") or ""
     confirm_password = form.get("confirm_password") or ""
     form_data = {"email": email}
@@ -4678,12 +5261,16 @@ async def register_step_one(request: Request, db: Session = Depends(get_db)):
             ensure_not_disposable(email)
         except HTTPException as exc:
             return render_form(exc.detail["message"], status_code=exc.status_code)
-        if email in users_by_email or db.query(User).filter(User.email == email).first():
+        if (
+            email in users_by_email
+            or db.query(User.id).filter(func.lower(User.email) == email).limit(1).scalar()
+            is not None
+        ):
             return render_form(
                 "We couldn't process your request. Please try again later.",
                 status_code=400,
             )
-        password_hash = hash_password(password)
+        password_hash = await to_thread.run_sync(hash_password, password)
         temp_username = f"pending_{uuid4().hex[:8]}"
         temp_username_lower = temp_username.lower()
         db_user = User(
@@ -4693,8 +5280,9 @@ async def register_step_one(request: Request, db: Session = Depends(get_db)):
             role=RoleEnum.REGISTERING,
         )
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        # The id is assigned on flush; everything else is already known here,
+        # so the committed row never needs reloading.
+        db.flush()
         user = DemoUser(
             id=db_user.id,
             username=temp_username_lower,
@@ -4702,9 +5290,8 @@ async def register_step_one(request: Request, db: Session = Depends(get_db)):
             email=email,
             role="registering",
         )
-        users[user.id] = user
-        users_by_username[temp_username_lower] = user
-        users_by_email[email] = user
+        db.commit()
+        cache_user(user)
         request.session["user_id"] = user.id
         client_ip_raw = get_request_ip(request)
         canonical_ip = None
@@ -4715,10 +5302,10 @@ async def register_step_one(request: Request, db: Session = Depends(get_db)):
                 canonical_ip = client_ip_raw
         log_action(
             db,
-            actor_user_id=db_user.id,
+            actor_user_id=user.id,
             action="register",
             entity_type="User",
-            entity_id=db_user.id,
+            entity_id=user.id,
             ip=canonical_ip,
             user_agent=request.headers.get("user-agent"),
         )
@@ -4727,10 +5314,8 @@ async def register_step_one(request: Request, db: Session = Depends(get_db)):
             user.base_role = "ip_block"
             db_user.role = RoleEnum.IPBLOCK
             db.commit()
-            return RedirectResponse(
-                url="/ip-blocked", status_code=status.HTTP_303_SEE_OTHER
-            )
-        return RedirectResponse(url="/register/details", status_code=status.HTTP_303_SEE_OTHER)
+            return see_other("/ip-blocked")
+        return see_other("/register/details")
     return render_form("All fields are required")
 
 
@@ -4739,7 +5324,7 @@ async def register_details_form(request: Request):
     """Display step two of registration (username & phone)."""
     user = get_current_user(request)
     if not user or user.role != "registering":
-        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/login")
     return render_template("register.html", request=request)
 
 
@@ -4748,7 +5333,7 @@ async def register_details(request: Request, db: Session = Depends(get_db)):
     """Handle step two of registration."""
     user = get_current_user(request)
     if not user or user.role != "registering":
-        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/login")
     # Ensure the request's language is resolved so welcome notifications
     # respect the active locale when sent.
     translator_for_request(request)
@@ -4786,17 +5371,24 @@ async def register_details(request: Request, db: Session = Depends(get_db)):
             or username_lower in RESERVED_USERNAMES
         ):
             return render_form(USERNAME_MESSAGE)
-        if (
-            username_lower in users_by_username
-            or db.query(User)
-            .filter(func.lower(User.username) == username_lower)
-            .first()
+        # One indexed probe covers both unique fields; at most one row can
+        # match each, so two rows are enough to tell which one clashed.
+        clashes = (
+            db.query(func.lower(User.username), User.phone_e164)
+            .filter(
+                or_(
+                    func.lower(User.username) == username_lower,
+                    User.phone_e164 == phone_e164,
+                )
+            )
+            .limit(2)
+            .all()
+        )
+        if username_lower in users_by_username or any(
+            taken == username_lower for taken, _ in clashes
         ):
             return render_form("Username already taken")
-        if (
-            any(u.phone_e164 == phone_e164 for u in users.values())
-            or db.query(User).filter(User.phone_e164 == phone_e164).first()
-        ):
+        if clashes:
             return render_form("Phone already in use", status_code=409)
         db_user = db.query(User).filter(User.id == user.id).first()
         db_user.username = username_lower
@@ -4855,7 +5447,7 @@ async def register_details(request: Request, db: Session = Depends(get_db)):
             )
             db.add(note)
             db.commit()
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     return render_form("All fields are required")
 
 
@@ -4869,7 +5461,11 @@ async def login_form(request: Request):
 
 
 @app.post("/login", response_class=HTMLResponse)
-async def login(request: Request, db: Session = Depends(get_db)):
+async def login(
+    request: Request,
+    background: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
     """Handle login submissions."""
     existing_user = get_current_user(request)
     await enforce_csrf(request)
@@ -4903,7 +5499,7 @@ async def login(request: Request, db: Session = Depends(get_db)):
             canonical_ip = client_ip_raw
         ip_throttle_key = _coarsen_ip_for_throttle(canonical_ip)
     if email and password:
-        normalized_email = (email or "").strip().lower()
+        normalized_email = normalize_email(email)
         throttle_keys: list[tuple[str, str]] = []
         if normalized_email:
             throttle_keys.append(("email", normalized_email))
@@ -4924,10 +5520,14 @@ async def login(request: Request, db: Session = Depends(get_db)):
         if email_record and email_record.fail_count >= LOGIN_BACKOFF_THRESHOLD:
             delay = min(8, 2 ** (email_record.fail_count - LOGIN_BACKOFF_THRESHOLD + 1))
             await asyncio.sleep(delay)
-        db_user = db.query(User).filter(User.email == email).first()
-        user = users_by_email.get(email)
+        db_user = (
+            db.query(User).filter(func.lower(User.email) == normalized_email).first()
+        )
+        user = users_by_email.get(normalized_email)
         if not user:
-            if db_user and verify_password(db_user.password_hash, password):
+            if db_user and await to_thread.run_sync(
+                verify_password, db_user.password_hash, password
+            ):
                 role_map = {
                     RoleEnum.SUPERADMIN: "super_admin",
                     RoleEnum.BARADMIN: "bar_admin",
@@ -4986,24 +5586,31 @@ async def login(request: Request, db: Session = Depends(get_db)):
                             TransactionItem(i["name"], i["quantity"], i["price"])
                             for i in (row.items_json or [])
                         ]
-                        user.transactions.append(tx)
-                users[user.id] = user
-                users_by_email[user.email] = user
-                users_by_username[user.username.lower()] = user
-        if not user or not verify_password(user.password_hash, password):
+                        user.add_transaction(tx)
+                cache_user(user)
+        if not user or not await to_thread.run_sync(
+            verify_password, user.password_hash, password
+        ):
             _register_login_failure(db, throttle_keys, now, rate_limits)
             return render_template(
                 "login.html", request=request, error="Invalid credentials"
             )
         _clear_login_failures(db, throttle_keys)
+        if not user.password_hash.startswith("$argon2"):
+            # Upgrade legacy SHA-256 hashes now that we hold the plain password.
+            user.password_hash = await to_thread.run_sync(hash_password, password)
+            if db_user:
+                db_user.password_hash = user.password_hash
+                db.commit()
         if db_user and db_user.role == RoleEnum.SUPERADMIN:
             user.role = "super_admin"
             user.base_role = "super_admin"
         if user.is_ip_blocked and user.base_role and user.base_role != "ip_block":
             user.role = user.base_role
         request.session["user_id"] = user.id
-        log_action(
-            db,
+        # Audit rows are write-only here; insert after the response is sent.
+        background.add_task(
+            log_action_in_new_session,
             actor_user_id=user.id,
             action="login",
             entity_type="User",
@@ -5028,15 +5635,11 @@ async def login(request: Request, db: Session = Depends(get_db)):
                 }:
                     db_user.role = RoleEnum.IPBLOCK
                     db.commit()
-                return RedirectResponse(
-                    url="/ip-blocked", status_code=status.HTTP_303_SEE_OTHER
-                )
+                return see_other("/ip-blocked")
         if user.base_role == "ip_block" and not user.is_super_admin:
             user.role = "ip_block"
-            return RedirectResponse(
-                url="/ip-blocked", status_code=status.HTTP_303_SEE_OTHER
-            )
-        return RedirectResponse(url="/dashboard", status_code=status.HTTP_303_SEE_OTHER)
+            return see_other("/ip-blocked")
+        return see_other("/dashboard")
     return render_template(
         "login.html", request=request, error="Email and password required"
     )
@@ -5056,11 +5659,10 @@ async def disposable_domains_stats(request: Request):
 
 
 @app.get("/profile", response_class=HTMLResponse)
-async def profile_form(request: Request):
+async def profile_form(request: Request, success: str | None = None):
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
-    success = request.query_params.get("success")
+        return see_other("/login")
     return render_template("profile.html", request=request, success=success)
 
 
@@ -5068,11 +5670,11 @@ async def profile_form(request: Request):
 async def profile_update(request: Request, db: Session = Depends(get_db)):
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/login")
     await enforce_csrf(request)
     form = await request.form()
     username = form.get("username") or ""
-    email = form.get("email") or ""
+    email = normalize_email(form.get("email"))
     phone = form.get("phone") or ""
     prefix = form.get("prefix") or ""
     form_data = {"username": username, "email": email, "phone": phone, "prefix": prefix}
@@ -5109,18 +5711,25 @@ async def profile_update(request: Request, db: Session = Depends(get_db)):
         return render_form("Invalid email format")
     if username_lower != user.username.lower() and (
         username_lower in users_by_username
-        or db.query(User).filter(func.lower(User.username) == username_lower).first()
+        or db.query(User.id)
+        .filter(func.lower(User.username) == username_lower)
+        .limit(1)
+        .scalar()
+        is not None
     ):
         return render_form("Username already taken")
-    if email != user.email and (
-        email in users_by_email or db.query(User).filter(User.email == email).first()
+    if email != normalize_email(user.email) and (
+        email in users_by_email
+        or db.query(User.id).filter(func.lower(User.email) == email).limit(1).scalar() is not None
     ):
         return render_form("Email already taken")
-    if phone_e164 != user.phone_e164 and (
-        any(u.id != user.id and u.phone_e164 == phone_e164 for u in users.values())
-        or db.query(User)
+    if (
+        phone_e164 != user.phone_e164
+        and db.query(User.id)
         .filter(User.phone_e164 == phone_e164, User.id != user.id)
-        .first()
+        .limit(1)
+        .scalar()
+        is not None
     ):
         return render_form("Phone already in use", status_code=409)
     db_user = db.query(User).filter(User.id == user.id).first()
@@ -5165,12 +5774,10 @@ async def profile_update(request: Request, db: Session = Depends(get_db)):
         users_by_username[username_lower] = user
     else:
         user.username = username_lower
-    if email != user.email:
-        del users_by_email[user.email]
-        user.email = email
+    if email != normalize_email(user.email):
+        users_by_email.pop(normalize_email(user.email), None)
         users_by_email[email] = user
-    else:
-        user.email = email
+    user.email = email
     user.prefix = prefix
     user.phone = phone
     user.phone_e164 = phone_e164
@@ -5194,14 +5801,14 @@ async def profile_update(request: Request, db: Session = Depends(get_db)):
             phone=user.phone_e164,
             credit=float(user.credit or 0),
         )
-    return RedirectResponse(url="/profile?success=1", status_code=status.HTTP_303_SEE_OTHER)
+    return see_other("/profile?success=1")
 
 
 @app.get("/profile/password", response_class=HTMLResponse)
 async def profile_password_form(request: Request):
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/login")
     return render_template("change_password.html", request=request)
 
 
@@ -5209,7 +5816,7 @@ async def profile_password_form(request: Request):
 async def profile_password_update(request: Request, db: Session = Depends(get_db)):
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/login")
     await enforce_csrf(request)
     form = await request.form()
     current_password = form.get("current_password") or ""
@@ -5226,7 +5833,9 @@ async def profile_password_update(request: Request, db: Session = Depends(get_db
 
     if not all([current_password, password, confirm_password]):
         return render_form("All fields are required")
-    if not verify_password(user.password_hash, current_password):
+    if not await to_thread.run_sync(
+        verify_password, user.password_hash, current_password
+    ):
         return render_form("Current password is incorrect")
     if len(password) < 8 or len(password) > 128:
         return render_form("Password must be between 8 and 128 characters")
@@ -5237,13 +5846,13 @@ async def profile_password_update(request: Request, db: Session = Depends(get_db
     db_user = db.query(User).filter(User.id == user.id).first()
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
-    user.password_hash = hash_password(password)
+    user.password_hash = await to_thread.run_sync(hash_password, password)
     db_user.password_hash = user.password_hash
     if user.email:
         _clear_login_failures(db, [("email", user.email.lower())])
     db.commit()
     request.session.clear()
-    return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+    return see_other("/login")
 
 
 @app.post("/logout")
@@ -5253,7 +5862,7 @@ async def logout(request: Request):
     if user and (user.is_blocked or user.is_ip_blocked):
         return redirect_for_authenticated_user(user)
     request.session.clear()
-    return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+    return see_other("/")
 
 
 @app.get("/logout", include_in_schema=False)
@@ -5261,16 +5870,16 @@ async def logout_via_get(request: Request):
     user = get_current_user(request)
     if user:
         return redirect_for_authenticated_user(user)
-    return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+    return see_other("/")
 
 
 @app.get("/blocked", response_class=HTMLResponse)
 async def blocked_view(request: Request):
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     if not getattr(user, "is_blocked", False):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     translator_for_request(request)
     return render_template("blocked.html", request=request, user=user)
 
@@ -5279,9 +5888,9 @@ async def blocked_view(request: Request):
 async def ip_blocked_view(request: Request):
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     if not getattr(user, "is_ip_blocked", False):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     translator_for_request(request)
     return render_template("ip_blocked.html", request=request, user=user)
 
@@ -5290,7 +5899,7 @@ async def ip_blocked_view(request: Request):
 async def dashboard(request: Request):
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/login")
     if user.is_super_admin:
         return render_template("admin_dashboard.html", request=request)
     if user.is_bar_admin:
@@ -5305,13 +5914,10 @@ async def dashboard(request: Request):
         )
     if user.is_display:
         if user.bar_ids:
-            return RedirectResponse(
-                url=f"/dashboard/bar/{user.bar_id}/orders",
-                status_code=status.HTTP_303_SEE_OTHER,
-            )
+            return see_other(f"/dashboard/bar/{user.bar_id}/orders")
         request.session.clear()
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
-    return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
+    return see_other("/")
 
 
 @app.get("/dashboard/bar/{bar_id}/orders", response_class=HTMLResponse)
@@ -5327,7 +5933,7 @@ async def manage_orders(request: Request, bar_id: int):
             or user.is_display
         )
     ):
-        return RedirectResponse(url="/dashboard", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/dashboard")
     bar = bars.get(bar_id)
     if not bar:
         raise HTTPException(status_code=404)
@@ -5378,7 +5984,7 @@ async def bar_admin_order_history(request: Request, bar_id: int, db: Session = D
         or (bar_id not in user.bar_ids and not user.is_super_admin)
         or not (user.is_bar_admin or user.is_super_admin)
     ):
-        return RedirectResponse(url="/dashboard", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/dashboard")
     bar = bars.get(bar_id)
     if not bar:
         raise HTTPException(status_code=404)
@@ -5463,7 +6069,7 @@ async def bar_admin_order_history_month(
         or (bar_id not in user.bar_ids and not user.is_super_admin)
         or not (user.is_bar_admin or user.is_super_admin)
     ):
-        return RedirectResponse(url="/dashboard", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/dashboard")
     bar = bars.get(bar_id)
     if not bar:
         raise HTTPException(status_code=404)
@@ -5532,7 +6138,7 @@ async def confirm_monthly_payment(
 ):
     user = get_current_user(request)
     if not user or not user.is_super_admin:
-        return RedirectResponse(url="/dashboard", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/dashboard")
     start = datetime(year, month, 1)
     if month == 12:
         end = datetime(year + 1, 1, 1)
@@ -5548,9 +6154,7 @@ async def confirm_monthly_payment(
         .update({"payment_confirmed": True}, synchronize_session=False)
     )
     db.commit()
-    return RedirectResponse(
-        url=f"/dashboard/bar/{bar_id}/orders/history", status_code=status.HTTP_303_SEE_OTHER
-    )
+    return see_other(f"/dashboard/bar/{bar_id}/orders/history")
 
 
 @app.get(
@@ -5565,7 +6169,7 @@ async def bar_admin_order_history_view(
         or (bar_id not in user.bar_ids and not user.is_super_admin)
         or not (user.is_bar_admin or user.is_super_admin)
     ):
-        return RedirectResponse(url="/dashboard", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/dashboard")
     bar = bars.get(bar_id)
     if not bar:
         raise HTTPException(status_code=404)
@@ -5617,20 +6221,20 @@ async def bar_admin_order_history_view(
 
 
 @app.get("/admin/bars", response_class=HTMLResponse)
-async def admin_bars_view(request: Request, db: Session = Depends(get_db)):
-    user = get_current_user(request)
-    if not user or not user.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+async def admin_bars_view(
+    request: Request,
+    db: Session = Depends(get_db),
+    user: DemoUser = Depends(require_super_admin),
+):
     db_bars = db.query(BarModel).order_by(BarModel.id).all()
     return render_template("admin_bars.html", request=request, bars=db_bars)
 
 
 @app.get("/admin/bars/new", response_class=HTMLResponse)
-async def new_bar_form(request: Request):
+async def new_bar_form(
+    request: Request, user: DemoUser = Depends(require_super_admin)
+):
     """Display the creation form for a new bar."""
-    user = get_current_user(request)
-    if not user or not user.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     return render_template(
         "admin_new_bar.html",
         request=request,
@@ -5639,11 +6243,12 @@ async def new_bar_form(request: Request):
 
 
 @app.post("/admin/bars/new")
-async def create_bar_post(request: Request, db: Session = Depends(get_db)):
+async def create_bar_post(
+    request: Request,
+    db: Session = Depends(get_db),
+    user: DemoUser = Depends(require_super_admin),
+):
     """Create a new bar from submitted form data."""
-    user = get_current_user(request)
-    if not user or not user.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     await enforce_csrf(request)
     form = await request.form()
     name = form.get("name")
@@ -5660,12 +6265,7 @@ async def create_bar_post(request: Request, db: Session = Depends(get_db)):
         translations = {code: description for code in LANGUAGES}
     rating = form.get("rating")
     manual_closed = form.get("manual_closed") == "on"
-    hours = {}
-    for i in range(7):
-        o = form.get(f"open_{i}")
-        c = form.get(f"close_{i}")
-        if o and c:
-            hours[str(i)] = {"open": o, "close": c}
+    hours = opening_hours_from_form(form)
     opening_hours = json.dumps(hours) if hours else None
     categories = form.getlist("categories")
     if len(categories) > 5:
@@ -5721,10 +6321,11 @@ async def create_bar_post(request: Request, db: Session = Depends(get_db)):
         bar_categories=categories_csv,
     )
     db.add(db_bar)
+    db.flush()
+    bar_id = db_bar.id
     db.commit()
-    db.refresh(db_bar)
-    bars[db_bar.id] = Bar(
-        id=db_bar.id,
+    bars[bar_id] = Bar(
+        id=bar_id,
         name=name,
         address=address,
         city=city,
@@ -5740,7 +6341,8 @@ async def create_bar_post(request: Request, db: Session = Depends(get_db)):
         opening_hours=hours,
         bar_categories=categories,
     )
-    return RedirectResponse(url="/admin/bars", status_code=status.HTTP_303_SEE_OTHER)
+    refresh_bars_snapshot()
+    return see_other("/admin/bars")
 
 
 @app.get("/admin/bars/edit/{bar_id}", response_class=HTMLResponse)
@@ -5755,7 +6357,7 @@ async def edit_bar_options(
     if not user or not (
         user.is_super_admin or (user.is_bar_admin and bar_id in user.bar_ids)
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     return render_template("admin_edit_bar_options.html", request=request, bar=bar)
 
 
@@ -5768,14 +6370,9 @@ async def edit_bar_form(request: Request, bar_id: int, db: Session = Depends(get
     if not user or not (
         user.is_super_admin or (user.is_bar_admin and bar_id in user.bar_ids)
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     selected_categories = bar.bar_categories.split(",") if bar.bar_categories else []
-    try:
-        hours = json.loads(bar.opening_hours) if bar.opening_hours else {}
-        if not isinstance(hours, dict):
-            hours = {}
-    except Exception:
-        hours = {}
+    hours = opening_hours_dict(bar.opening_hours)
     return render_template(
         "admin_edit_bar.html",
         request=request,
@@ -5795,7 +6392,7 @@ async def edit_bar_post(request: Request, bar_id: int, db: Session = Depends(get
     if not user or not (
         user.is_super_admin or (user.is_bar_admin and bar_id in user.bar_ids)
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     await enforce_csrf(request)
     form = await request.form()
     name = form.get("name")
@@ -5806,19 +6403,9 @@ async def edit_bar_post(request: Request, bar_id: int, db: Session = Depends(get
     longitude = form.get("longitude")
     rating = form.get("rating") if user.is_super_admin else None
     manual_closed = form.get("manual_closed") == "on"
-    try:
-        existing_hours = json.loads(bar.opening_hours) if bar.opening_hours else {}
-        if not isinstance(existing_hours, dict):
-            existing_hours = {}
-    except Exception:
-        existing_hours = {}
+    existing_hours = opening_hours_dict(bar.opening_hours)
 
-    hours = {}
-    for i in range(7):
-        o = form.get(f"open_{i}")
-        c = form.get(f"close_{i}")
-        if o and c:
-            hours[str(i)] = {"open": o, "close": c}
+    hours = opening_hours_from_form(form)
     if hours:
         opening_hours = json.dumps(hours)
     elif manual_closed and bar.opening_hours:
@@ -5879,6 +6466,7 @@ async def edit_bar_post(request: Request, bar_id: int, db: Session = Depends(get
             mem_bar.address = address
             mem_bar.city = city
             mem_bar.state = state
+            mem_bar.search_blob = bar_search_blob(name, address, city, state)
             mem_bar.latitude = lat
             mem_bar.longitude = lon
             mem_bar.photo_url = photo_url
@@ -5889,10 +6477,8 @@ async def edit_bar_post(request: Request, bar_id: int, db: Session = Depends(get
             mem_bar.is_open_now = is_open_now_from_hours(hours) and not manual_closed
             mem_bar.bar_categories = categories
         if user.is_super_admin:
-            return RedirectResponse(
-                url="/admin/bars", status_code=status.HTTP_303_SEE_OTHER
-            )
-        return RedirectResponse(url="/dashboard", status_code=status.HTTP_303_SEE_OTHER)
+            return see_other("/admin/bars")
+        return see_other("/dashboard")
     return render_template(
         "admin_edit_bar.html",
         request=request,
@@ -5915,7 +6501,7 @@ async def edit_bar_description_form(
     if not user or not (
         user.is_super_admin or (user.is_bar_admin and bar_id in user.bar_ids)
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     translations = dict(bar.description_translations or {})
     base_description = (
         translations.get(DEFAULT_LANGUAGE)
@@ -5944,7 +6530,7 @@ async def edit_bar_description_post(
     if not user or not (
         user.is_super_admin or (user.is_bar_admin and bar_id in user.bar_ids)
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     await enforce_csrf(request)
     form = await request.form()
     translations: Dict[str, str] = {}
@@ -5978,29 +6564,35 @@ async def edit_bar_description_post(
         mem_bar.description_translations = dict(translations)
         mem_bar.description = primary_description
     if user.is_super_admin:
-        return RedirectResponse(
-            url=f"/admin/bars/edit/{bar_id}/info", status_code=status.HTTP_303_SEE_OTHER
-        )
-    return RedirectResponse(url="/dashboard", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other(f"/admin/bars/edit/{bar_id}/info")
+    return see_other("/dashboard")
 
 
 @app.post("/admin/bars/{bar_id}/delete")
-async def delete_bar(request: Request, bar_id: int, db: Session = Depends(get_db)):
-    user = get_current_user(request)
-    if not user or not user.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+async def delete_bar(
+    request: Request,
+    bar_id: int,
+    db: Session = Depends(get_db),
+    user: DemoUser = Depends(require_super_admin),
+):
     await enforce_csrf(request)
     bar = db.get(BarModel, bar_id)
     if not bar:
         raise HTTPException(status_code=404, detail="Bar not found")
-    # Remove dependent records to satisfy foreign key constraints
-    menu_item_ids = [
-        m.id for m in db.query(MenuItem.id).filter(MenuItem.bar_id == bar_id)
-    ]
-    if menu_item_ids:
-        db.query(MenuVariant).filter(
-            MenuVariant.menu_item_id.in_(menu_item_ids)
-        ).delete(synchronize_session=False)
+    # Remove dependent records to satisfy foreign key constraints. Children are
+    # matched by subquery so the id lists never travel through Python.
+    order_ids = db.query(Order.id).filter(Order.bar_id == bar_id).scalar_subquery()
+    db.query(OrderItem).filter(OrderItem.order_id.in_(order_ids)).delete(
+        synchronize_session=False
+    )
+    db.query(Order).filter(Order.bar_id == bar_id).delete(synchronize_session=False)
+
+    menu_item_ids = (
+        db.query(MenuItem.id).filter(MenuItem.bar_id == bar_id).scalar_subquery()
+    )
+    db.query(MenuVariant).filter(MenuVariant.menu_item_id.in_(menu_item_ids)).delete(
+        synchronize_session=False
+    )
     db.query(MenuItem).filter(MenuItem.bar_id == bar_id).delete(
         synchronize_session=False
     )
@@ -6012,19 +6604,15 @@ async def delete_bar(request: Request, bar_id: int, db: Session = Depends(get_db
         synchronize_session=False
     )
 
-    order_ids = [o.id for o in db.query(Order.id).filter(Order.bar_id == bar_id)]
-    if order_ids:
-        db.query(OrderItem).filter(OrderItem.order_id.in_(order_ids)).delete(
-            synchronize_session=False
-        )
-    db.query(Order).filter(Order.bar_id == bar_id).delete(synchronize_session=False)
-
     db.query(Payout).filter(Payout.bar_id == bar_id).delete(synchronize_session=False)
 
     db.delete(bar)
     db.commit()
-    bars.pop(bar_id, None)
-    return RedirectResponse(url="/admin/bars", status_code=status.HTTP_303_SEE_OTHER)
+    mem_bar = bars.pop(bar_id, None)
+    if mem_bar:
+        mem_bar.clear_staff()
+        refresh_bars_snapshot()
+    return see_other("/admin/bars")
 
 
 @app.get("/admin/bars/{bar_id}/users", response_class=HTMLResponse)
@@ -6038,8 +6626,8 @@ async def manage_bar_users(
         or not user
         or not (user.is_super_admin or (user.is_bar_admin and bar_id in user.bar_ids))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
-    staff = [_load_demo_user(uid, db) for uid in bar.bar_admin_ids + bar.bartender_ids]
+        return see_other("/")
+    staff = _load_demo_users(bar.staff_ids, db)
     return render_template(
         "admin_bar_users.html", request=request, bar=bar, staff=staff
     )
@@ -6059,65 +6647,54 @@ async def manage_bar_users_post(
             or (current.is_bar_admin and bar_id in current.bar_ids)
         )
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     await enforce_csrf(request)
     form = await request.form()
     action = form.get("action")
     role = form.get("role")
-    role_map = {
-        "bar_admin": RoleEnum.BARADMIN,
-        "bartender": RoleEnum.BARTENDER,
-        "display": RoleEnum.DISPLAY,
-    }
-    protected_roles = {RoleEnum.SUPERADMIN, RoleEnum.FINANCE}
     error = None
     message = None
     if action == "existing":
-        email = form.get("email")
-        if not email or role not in role_map:
+        email = normalize_email(form.get("email"))
+        if not email or role not in BAR_STAFF_ROLES:
             error = "Email and role required"
         else:
-            db_user = db.query(User).filter(User.email == email).first()
+            # The user and any existing role at this bar come back together.
+            db_user, rel = (
+                db.query(User, UserBarRole)
+                .outerjoin(
+                    UserBarRole,
+                    and_(
+                        UserBarRole.user_id == User.id,
+                        UserBarRole.bar_id == bar_id,
+                    ),
+                )
+                .filter(func.lower(User.email) == email)
+                .first()
+            ) or (None, None)
             if not db_user:
                 error = "User not found"
-            elif db_user.role in protected_roles:
+            elif db_user.role in PROTECTED_STAFF_ROLES:
                 error = "Cannot modify this user"
             else:
-                rel = (
-                    db.query(UserBarRole)
-                    .filter(
-                        UserBarRole.user_id == db_user.id,
-                        UserBarRole.bar_id == bar_id,
-                    )
-                    .first()
-                )
                 if not current.is_super_admin and not rel:
                     error = "User not assigned to this bar"
                 else:
                     if not rel:
                         rel = UserBarRole(
-                            user_id=db_user.id, bar_id=bar_id, role=role_map[role]
+                            user_id=db_user.id, bar_id=bar_id, role=BAR_STAFF_ROLES[role]
                         )
                         db.add(rel)
                     else:
-                        rel.role = role_map[role]
+                        rel.role = BAR_STAFF_ROLES[role]
                     if current.is_super_admin:
-                        db_user.role = role_map[role]
+                        db_user.role = BAR_STAFF_ROLES[role]
                     db.commit()
                     demo = _load_demo_user(db_user.id, db)
                     demo.role = role
                     if bar_id not in demo.bar_ids:
                         demo.bar_ids.append(bar_id)
-                    if role == "bar_admin":
-                        if demo.id not in bar.bar_admin_ids:
-                            bar.bar_admin_ids.append(demo.id)
-                        if demo.id in bar.bartender_ids:
-                            bar.bartender_ids.remove(demo.id)
-                    else:
-                        if demo.id not in bar.bartender_ids:
-                            bar.bartender_ids.append(demo.id)
-                        if demo.id in bar.bar_admin_ids:
-                            bar.bar_admin_ids.remove(demo.id)
+                    bar.add_staff(demo.id, role)
                     message = "User assigned"
     elif action == "remove":
         uid = form.get("user_id")
@@ -6128,16 +6705,19 @@ async def manage_bar_users_post(
         if not uid_int:
             error = "Invalid user"
         else:
-            rel = (
-                db.query(UserBarRole)
-                .filter(
-                    UserBarRole.user_id == uid_int,
-                    UserBarRole.bar_id == bar_id,
+            db_user, rel = (
+                db.query(User, UserBarRole)
+                .outerjoin(
+                    UserBarRole,
+                    and_(
+                        UserBarRole.user_id == User.id,
+                        UserBarRole.bar_id == bar_id,
+                    ),
                 )
+                .filter(User.id == uid_int)
                 .first()
-            )
-            db_user = db.get(User, uid_int)
-            if db_user and db_user.role in protected_roles:
+            ) or (None, None)
+            if db_user and db_user.role in PROTECTED_STAFF_ROLES:
                 error = "Cannot modify this user"
             elif not rel:
                 error = "User not assigned"
@@ -6145,16 +6725,13 @@ async def manage_bar_users_post(
                 db.delete(rel)
                 db.commit()
                 demo = _load_demo_user(uid_int, db)
-                if uid_int in bar.bar_admin_ids:
-                    bar.bar_admin_ids.remove(uid_int)
-                if uid_int in bar.bartender_ids:
-                    bar.bartender_ids.remove(uid_int)
+                bar.remove_staff(uid_int)
                 if bar_id in demo.bar_ids:
                     demo.bar_ids.remove(bar_id)
                 message = "User removed"
     else:
         error = "Invalid action"
-    staff = [_load_demo_user(uid, db) for uid in bar.bar_admin_ids + bar.bartender_ids]
+    staff = _load_demo_users(bar.staff_ids, db)
     return render_template(
         "admin_bar_users.html",
         request=request,
@@ -6176,7 +6753,7 @@ async def manage_bar_tables(
         or not user
         or not (user.is_super_admin or (user.is_bar_admin and bar_id in user.bar_ids))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     tables = sorted(bar.tables.values(), key=lambda t: t.id)
     return render_template(
         "admin_bar_tables.html", request=request, bar=bar, tables=tables
@@ -6194,7 +6771,7 @@ async def new_bar_table_form(
         or not user
         or not (user.is_super_admin or (user.is_bar_admin and bar_id in user.bar_ids))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     return render_template("admin_bar_new_table.html", request=request, bar=bar)
 
 
@@ -6207,25 +6784,19 @@ async def add_bar_table(request: Request, bar_id: int, db: Session = Depends(get
         or not user
         or not (user.is_super_admin or (user.is_bar_admin and bar_id in user.bar_ids))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     await enforce_csrf(request)
     form = await request.form()
     name = form.get("name")
     description = form.get("description")
     if not name:
-        return RedirectResponse(
-            url=f"/admin/bars/{bar_id}/tables",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other(f"/admin/bars/{bar_id}/tables")
     table = TableModel(bar_id=bar_id, name=name, description=description)
     db.add(table)
     db.commit()
     db.refresh(table)
     bar.tables[table.id] = Table(id=table.id, name=name, description=description or "")
-    return RedirectResponse(
-        url=f"/admin/bars/{bar_id}/tables",
-        status_code=status.HTTP_303_SEE_OTHER,
-    )
+    return see_other(f"/admin/bars/{bar_id}/tables")
 
 
 @app.get("/admin/bars/{bar_id}/tables/{table_id}/edit", response_class=HTMLResponse)
@@ -6239,13 +6810,10 @@ async def edit_bar_table_form(
         or not user
         or not (user.is_super_admin or (user.is_bar_admin and bar_id in user.bar_ids))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     table = bar.tables.get(table_id)
     if not table:
-        return RedirectResponse(
-            url=f"/admin/bars/{bar_id}/tables",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other(f"/admin/bars/{bar_id}/tables")
     return render_template(
         "admin_bar_edit_table.html", request=request, bar=bar, table=table
     )
@@ -6262,22 +6830,16 @@ async def edit_bar_table(
         or not user
         or not (user.is_super_admin or (user.is_bar_admin and bar_id in user.bar_ids))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     await enforce_csrf(request)
     db_table = db.get(TableModel, table_id)
     if not db_table or db_table.bar_id != bar_id:
-        return RedirectResponse(
-            url=f"/admin/bars/{bar_id}/tables",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other(f"/admin/bars/{bar_id}/tables")
     form = await request.form()
     name = form.get("name")
     description = form.get("description")
     if not name:
-        return RedirectResponse(
-            url=f"/admin/bars/{bar_id}/tables/{table_id}/edit",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other(f"/admin/bars/{bar_id}/tables/{table_id}/edit")
     db_table.name = name
     db_table.description = description
     db.commit()
@@ -6285,10 +6847,7 @@ async def edit_bar_table(
     bar.tables[table_id] = Table(
         id=db_table.id, name=db_table.name, description=db_table.description or ""
     )
-    return RedirectResponse(
-        url=f"/admin/bars/{bar_id}/tables",
-        status_code=status.HTTP_303_SEE_OTHER,
-    )
+    return see_other(f"/admin/bars/{bar_id}/tables")
 
 
 @app.post("/admin/bars/{bar_id}/tables/{table_id}/delete")
@@ -6302,33 +6861,26 @@ async def delete_bar_table(
         or not user
         or not (user.is_super_admin or (user.is_bar_admin and bar_id in user.bar_ids))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     await enforce_csrf(request)
     db_table = db.get(TableModel, table_id)
     if db_table and db_table.bar_id == bar_id:
         db.delete(db_table)
         db.commit()
         bar.tables.pop(table_id, None)
-    return RedirectResponse(
-        url=f"/admin/bars/{bar_id}/tables",
-        status_code=status.HTTP_303_SEE_OTHER,
-    )
+    return see_other(f"/admin/bars/{bar_id}/tables")
 
 
 @app.get("/confirm_bartender", response_class=HTMLResponse)
-async def confirm_bartender_page(request: Request):
+async def confirm_bartender_page(request: Request, bar_id: int = 0):
     user = get_current_user(request)
-    try:
-        bar_id = int(request.query_params.get("bar_id", 0))
-    except (TypeError, ValueError):
-        raise HTTPException(status_code=400, detail="Invalid bar")
     bar = bars.get(bar_id)
     if not user or not bar:
-        return RedirectResponse(url="/dashboard", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/dashboard")
     pending_invite = user.pending_bar_id == bar_id
     already_confirmed = user.id in bar.bartender_ids and user.pending_bar_id is None
     if not pending_invite and not already_confirmed:
-        return RedirectResponse(url="/dashboard", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/dashboard")
     return render_template(
         "bartender_confirm.html",
         request=request,
@@ -6338,28 +6890,21 @@ async def confirm_bartender_page(request: Request):
 
 
 @app.post("/confirm_bartender", response_class=HTMLResponse)
-async def confirm_bartender(request: Request):
+async def confirm_bartender(request: Request, bar_id: int = Form(0)):
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/login")
     await enforce_csrf(request)
-    form = await request.form()
-    try:
-        bar_id = int(form.get("bar_id", 0))
-    except (TypeError, ValueError):
-        raise HTTPException(status_code=400, detail="Invalid bar")
     bar = bars.get(bar_id)
     if not bar or user.pending_bar_id != bar_id:
-        return RedirectResponse(url="/dashboard", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/dashboard")
     user.role = "bartender"
     user.base_role = "bartender"
     if bar_id not in user.bar_ids:
         user.bar_ids.append(bar_id)
     user.pending_bar_id = None
-    if user.id not in bar.bartender_ids:
-        bar.bartender_ids.append(user.id)
-    if user.id in bar.pending_bartender_ids:
-        bar.pending_bartender_ids.remove(user.id)
+    bar.add_staff(user.id, "bartender")
+    bar.pending_bartender_ids.discard(user.id)
     return render_template(
         "bartender_confirm.html",
         request=request,
@@ -6369,18 +6914,19 @@ async def confirm_bartender(request: Request):
 
 
 @app.get("/admin/dashboard", response_class=HTMLResponse)
-async def admin_dashboard(request: Request):
-    user = get_current_user(request)
-    if not user or not user.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+async def admin_dashboard(
+    request: Request, user: DemoUser = Depends(require_super_admin)
+):
     return render_template("admin_dashboard.html", request=request)
 
 
 @app.get("/admin/ip-block", response_class=HTMLResponse)
-async def admin_ip_block(request: Request, message: str | None = None, error: str | None = None):
-    current = get_current_user(request)
-    if not current or not current.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+async def admin_ip_block(
+    request: Request,
+    message: str | None = None,
+    error: str | None = None,
+    current: DemoUser = Depends(require_super_admin),
+):
     entries = sorted(blocked_ips.values(), key=lambda e: e.created_at, reverse=True)
     return render_template(
         "admin_ip_block.html",
@@ -6393,36 +6939,25 @@ async def admin_ip_block(request: Request, message: str | None = None, error: st
 
 
 @app.post("/admin/ip-block", response_class=HTMLResponse)
-async def admin_ip_block_add(request: Request, db: Session = Depends(get_db)):
-    current = get_current_user(request)
-    if not current or not current.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+async def admin_ip_block_add(
+    request: Request,
+    db: Session = Depends(get_db),
+    current: DemoUser = Depends(require_super_admin),
+):
     await enforce_csrf(request)
     form = await request.form()
     raw_ip = (form.get("ip_address") or "").strip()
     note = (form.get("note") or "").strip()
     if not raw_ip:
-        return RedirectResponse(
-            url="/admin/ip-block?error=IP+required",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other("/admin/ip-block?error=IP+required")
     try:
         canonical_ip = ipaddress.ip_address(raw_ip).compressed
     except ValueError:
-        return RedirectResponse(
-            url="/admin/ip-block?error=Invalid+IP+address",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other("/admin/ip-block?error=Invalid+IP+address")
     if canonical_ip in blocked_ip_lookup:
-        return RedirectResponse(
-            url="/admin/ip-block?error=IP+already+blocked",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other("/admin/ip-block?error=IP+already+blocked")
     if len(note) > 255:
-        return RedirectResponse(
-            url="/admin/ip-block?error=Note+too+long",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other("/admin/ip-block?error=Note+too+long")
     entry = BlockedIP(address=canonical_ip, note=note or None)
     db.add(entry)
     db.commit()
@@ -6435,19 +6970,16 @@ async def admin_ip_block_add(request: Request, db: Session = Depends(get_db)):
     )
     blocked_ips[record.id] = record
     blocked_ip_lookup[record.address] = record
-    return RedirectResponse(
-        url="/admin/ip-block?message=IP+added",
-        status_code=status.HTTP_303_SEE_OTHER,
-    )
+    return see_other("/admin/ip-block?message=IP+added")
 
 
 @app.post("/admin/ip-block/{entry_id}/delete", response_class=HTMLResponse)
 async def admin_ip_block_delete(
-    request: Request, entry_id: int, db: Session = Depends(get_db)
+    request: Request,
+    entry_id: int,
+    db: Session = Depends(get_db),
+    current: DemoUser = Depends(require_super_admin),
 ):
-    current = get_current_user(request)
-    if not current or not current.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     await enforce_csrf(request)
     entry = db.get(BlockedIP, entry_id)
     if entry:
@@ -6457,17 +6989,15 @@ async def admin_ip_block_delete(
         blocked_ips.pop(entry_id, None)
         if address:
             blocked_ip_lookup.pop(address, None)
-    return RedirectResponse(
-        url="/admin/ip-block?message=IP+removed",
-        status_code=status.HTTP_303_SEE_OTHER,
-    )
+    return see_other("/admin/ip-block?message=IP+removed")
 
 
 @app.get("/admin/payments", response_class=HTMLResponse)
-async def admin_payments(request: Request, db: Session = Depends(get_db)):
-    user = get_current_user(request)
-    if not user or not user.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+async def admin_payments(
+    request: Request,
+    db: Session = Depends(get_db),
+    user: DemoUser = Depends(require_super_admin),
+):
     db_bars = db.query(BarModel).order_by(BarModel.id.asc()).all()
     return render_template("admin_payments.html", request=request, bars=db_bars)
 
@@ -6479,10 +7009,8 @@ async def admin_audit_logs(
     bar: str | None = None,
     action: str | None = None,
     db: Session = Depends(get_db),
+    user: DemoUser = Depends(require_super_admin),
 ):
-    user = get_current_user(request)
-    if not user or not user.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     query = db.query(AuditLog)
     if username:
         query = query.join(User, AuditLog.actor_user_id == User.id).filter(
@@ -6542,11 +7070,11 @@ async def admin_audit_logs(
 
 @app.post("/admin/payments/{bar_id}/test_closing")
 async def admin_create_test_closing(
-    request: Request, bar_id: int, db: Session = Depends(get_db)
+    request: Request,
+    bar_id: int,
+    db: Session = Depends(get_db),
+    user: DemoUser = Depends(require_super_admin),
 ):
-    user = get_current_user(request)
-    if not user or not user.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     await enforce_csrf(request)
     now = datetime.now()
     if now.month == 1:
@@ -6559,19 +7087,16 @@ async def admin_create_test_closing(
     closing = BarClosing(bar_id=bar_id, closed_at=start, total_revenue=0)
     db.add(closing)
     db.commit()
-    return RedirectResponse(
-        url=f"/dashboard/bar/{bar_id}/orders/history",
-        status_code=status.HTTP_303_SEE_OTHER,
-    )
+    return see_other(f"/dashboard/bar/{bar_id}/orders/history")
 
 
 @app.post("/admin/payments/{bar_id}/test_closing/delete")
 async def admin_delete_test_closing(
-    request: Request, bar_id: int, db: Session = Depends(get_db)
+    request: Request,
+    bar_id: int,
+    db: Session = Depends(get_db),
+    user: DemoUser = Depends(require_super_admin),
 ):
-    user = get_current_user(request)
-    if not user or not user.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     await enforce_csrf(request)
     now = datetime.now()
     if now.month == 1:
@@ -6596,29 +7121,28 @@ async def admin_delete_test_closing(
         .delete(synchronize_session=False)
     )
     db.commit()
-    return RedirectResponse(
-        url=f"/dashboard/bar/{bar_id}/orders/history",
-        status_code=status.HTTP_303_SEE_OTHER,
-    )
+    return see_other(f"/dashboard/bar/{bar_id}/orders/history")
 
 
 @app.post("/admin/orders/clear")
-async def admin_clear_orders(request: Request, db: Session = Depends(get_db)):
-    user = get_current_user(request)
-    if not user or not user.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+async def admin_clear_orders(
+    request: Request,
+    db: Session = Depends(get_db),
+    user: DemoUser = Depends(require_super_admin),
+):
     await enforce_csrf(request)
     db.query(OrderItem).delete()
     db.query(Order).delete()
     db.commit()
-    return RedirectResponse(url="/admin/dashboard", status_code=status.HTTP_303_SEE_OTHER)
+    return see_other("/admin/dashboard")
 
 
 @app.get("/admin/analytics", response_class=HTMLResponse)
-async def admin_analytics(request: Request, db: Session = Depends(get_db)):
-    user = get_current_user(request)
-    if not user or not user.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+async def admin_analytics(
+    request: Request,
+    db: Session = Depends(get_db),
+    user: DemoUser = Depends(require_super_admin),
+):
     total_orders = db.query(func.count(Order.id)).scalar() or 0
     gmv_gross = float(
         db.query(func.coalesce(func.sum(Order.subtotal + Order.vat_total), 0)).scalar()
@@ -6817,23 +7341,53 @@ async def admin_analytics(request: Request, db: Session = Depends(get_db)):
 
 
 @app.get("/admin/profile", response_class=HTMLResponse)
-async def admin_profile(request: Request):
-    user = get_current_user(request)
-    if not user or not user.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+async def admin_profile(
+    request: Request, user: DemoUser = Depends(require_super_admin)
+):
     return render_template("admin_profile.html", request=request)
 
 
+ADMIN_USERS_PAGE_SIZE = 100
+USERNAME_PROBE_BATCH = 20
+
+
+def like_escape(value: str) -> str:
+    """Escape LIKE wildcards in ``value`` for use with ``escape="\\"``."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
 @app.get("/admin/users", response_class=HTMLResponse)
 async def admin_users_view(
-    request: Request, db: Session = Depends(get_db), error: str | None = None
+    request: Request,
+    db: Session = Depends(get_db),
+    error: str | None = None,
+    page: int = 1,
+    q: str | None = None,
+    user: DemoUser = Depends(require_super_admin),
 ):
-    user = get_current_user(request)
-    if not user or not user.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
-    # Synchronise in-memory users with the database so the list is always
-    # up to date even after a restart.
-    db_users = db.query(User).all()
+    q = (q or "").strip()
+    users_query = db.query(User)
+    if q:
+        pattern = f"%{like_escape(q)}%"
+        users_query = users_query.filter(
+            or_(
+                User.username.ilike(pattern, escape="\\"),
+                User.email.ilike(pattern, escape="\\"),
+            )
+        )
+    total_users = users_query.with_entities(func.count(User.id)).scalar() or 0
+    page_count = max(1, -(-total_users // ADMIN_USERS_PAGE_SIZE))
+    page = min(max(page, 1), page_count)
+    # Synchronise the in-memory users shown on this page with the database so
+    # the list is always up to date even after a restart.
+    db_users = (
+        users_query.options(selectinload(User.bar_roles))
+        .order_by(User.id)
+        .offset((page - 1) * ADMIN_USERS_PAGE_SIZE)
+        .limit(ADMIN_USERS_PAGE_SIZE)
+        .all()
+    )
+    page_users: List[DemoUser] = []
     role_map = {
         RoleEnum.SUPERADMIN: "super_admin",
         RoleEnum.BARADMIN: "bar_admin",
@@ -6860,6 +7414,7 @@ async def admin_users_view(
             existing.credit = credit
             existing.password_hash = db_user.password_hash
             users_by_username[existing.username.lower()] = existing
+            page_users.append(existing)
         else:
             demo = DemoUser(
                 id=db_user.id,
@@ -6874,46 +7429,65 @@ async def admin_users_view(
                 bar_ids=bar_ids,
                 credit=credit,
             )
-            users[demo.id] = demo
-            users_by_username[demo.username.lower()] = demo
-            users_by_email[demo.email] = demo
+            cache_user(demo)
+            page_users.append(demo)
     return render_template(
         "admin_users.html",
         request=request,
         user=user,
-        users=users.values(),
+        users=page_users,
         bars=bars,
         error=error,
+        page=page,
+        page_count=page_count,
+        q=q,
     )
 
 
 @app.post("/admin/users/new", response_class=HTMLResponse)
-async def admin_users_new(request: Request, db: Session = Depends(get_db)):
-    user = get_current_user(request)
-    if not user or not user.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+async def admin_users_new(
+    request: Request,
+    db: Session = Depends(get_db),
+    user: DemoUser = Depends(require_super_admin),
+):
     await enforce_csrf(request)
     form = await request.form()
-    email = (form.get("email") or "").strip()
+    email = normalize_email(form.get("email"))
     password = (form.get("password") or "").strip()
     if not email or not password or not re.fullmatch(r"[^@]+@[^@]+\.[^@]+", email):
-        return await admin_users_view(request, db, error="Invalid email or password")
-    if email in users_by_email or db.query(User).filter(User.email == email).first():
-        return await admin_users_view(request, db, error="Email already taken")
-    password_hash = hash_password(password)
-    base_username = re.sub(r"[^a-z0-9._-]", "", email.split("@")[0].lower()) or f"user_{uuid4().hex[:8]}"
-    username = base_username
-    counter = 1
-    while (
-        username in users_by_username
-        or db.query(User).filter(func.lower(User.username) == username).first()
+        return await admin_users_view(request, db, user=user, error="Invalid email or password")
+    if (
+        email in users_by_email
+        or db.query(User.id).filter(func.lower(User.email) == email).limit(1).scalar() is not None
     ):
-        username = f"{base_username}{counter}"
-        counter += 1
+        return await admin_users_view(request, db, user=user, error="Email already taken")
+    password_hash = await to_thread.run_sync(hash_password, password)
+    base_username = re.sub(r"[^a-z0-9._-]", "", email.split("@")[0].lower()) or f"user_{uuid4().hex[:8]}"
+    # Probe candidate names a batch at a time against the lower(username)
+    # index, so a common prefix never pulls in more than one batch of rows.
+    username = None
+    start = 0
+    while username is None:
+        candidates = [
+            f"{base_username}{n}" if n else base_username
+            for n in range(start, start + USERNAME_PROBE_BATCH)
+        ]
+        taken = {
+            name.lower()
+            for (name,) in db.query(User.username).filter(
+                func.lower(User.username).in_(candidates)
+            )
+        }
+        username = next(
+            (c for c in candidates if c not in taken and c not in users_by_username),
+            None,
+        )
+        start += USERNAME_PROBE_BATCH
     db_user = User(username=username, email=email, password_hash=password_hash)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    # Column defaults are populated on flush, so the new row can be mirrored
+    # before commit expires it; a brand-new user has no bar roles yet.
+    db.flush()
     demo = DemoUser(
         id=db_user.id,
         username=db_user.username,
@@ -6924,23 +7498,18 @@ async def admin_users_new(request: Request, db: Session = Depends(get_db)):
         phone_e164=db_user.phone_e164 or "",
         phone_region=db_user.phone_region or "",
         role="customer",
-        bar_ids=[r.bar_id for r in db_user.bar_roles],
+        bar_ids=[],
         credit=float(db_user.credit or 0),
     )
-    users[demo.id] = demo
-    users_by_username[demo.username.lower()] = demo
-    users_by_email[demo.email] = demo
-    return RedirectResponse(url="/admin/users", status_code=status.HTTP_303_SEE_OTHER)
+    db.commit()
+    cache_user(demo)
+    return see_other("/admin/users")
 
 
-def _load_demo_user(user_id: int, db: Session) -> DemoUser:
-    """Ensure a DemoUser exists for the given user id."""
-    user = users.get(user_id)
-    if user:
-        return user
-    db_user = db.query(User).filter(User.id == user_id).first()
-    if not db_user:
-        raise HTTPException(status_code=404, detail="User not found")
+def _demo_user_from_row(
+    db_user: User, tx_rows: Iterable[WalletTransaction]
+) -> DemoUser:
+    """Build and cache a DemoUser from its row and newest-first wallet rows."""
     role_map = {
         RoleEnum.SUPERADMIN: "super_admin",
         RoleEnum.BARADMIN: "bar_admin",
@@ -6965,12 +7534,6 @@ def _load_demo_user(user_id: int, db: Session) -> DemoUser:
         bar_ids=bar_ids,
         credit=float(db_user.credit or 0),
     )
-    tx_rows = (
-        db.query(WalletTransaction)
-        .filter(WalletTransaction.user_id == db_user.id)
-        .order_by(WalletTransaction.created_at.desc())
-        .all()
-    )
     for row in tx_rows:
         if row.type == "topup":
             user.transactions.append(
@@ -6999,18 +7562,55 @@ def _load_demo_user(user_id: int, db: Session) -> DemoUser:
                 TransactionItem(i["name"], i["quantity"], i["price"])
                 for i in (row.items_json or [])
             ]
-            user.transactions.append(tx)
-    users[user.id] = user
-    users_by_username[user.username.lower()] = user
-    users_by_email[user.email] = user
+            user.add_transaction(tx)
+    cache_user(user)
     return user
 
 
+def _load_demo_user(user_id: int, db: Session) -> DemoUser:
+    """Ensure a DemoUser exists for the given user id."""
+    user = users.get(user_id)
+    if user:
+        return user
+    db_user = db.get(User, user_id)
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    tx_rows = (
+        db.query(WalletTransaction)
+        .filter(WalletTransaction.user_id == db_user.id)
+        .order_by(WalletTransaction.created_at.desc())
+        .all()
+    )
+    return _demo_user_from_row(db_user, tx_rows)
+
+
+def _load_demo_users(user_ids: List[int], db: Session) -> List[DemoUser]:
+    """Like :func:`_load_demo_user` for many ids, batching uncached lookups."""
+    missing = [uid for uid in user_ids if uid not in users]
+    if missing:
+        tx_by_user: Dict[int, List[WalletTransaction]] = defaultdict(list)
+        for row in (
+            db.query(WalletTransaction)
+            .filter(WalletTransaction.user_id.in_(missing))
+            .order_by(WalletTransaction.created_at.desc())
+        ):
+            tx_by_user[row.user_id].append(row)
+        for db_user in (
+            db.query(User)
+            .options(selectinload(User.bar_roles))
+            .filter(User.id.in_(missing))
+        ):
+            _demo_user_from_row(db_user, tx_by_user[db_user.id])
+    return [_load_demo_user(uid, db) for uid in user_ids]
+
+
 @app.get("/admin/users/view/{user_id}", response_class=HTMLResponse)
-async def view_user(request: Request, user_id: int, db: Session = Depends(get_db)):
-    current = get_current_user(request)
-    if not current or not current.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+async def view_user(
+    request: Request,
+    user_id: int,
+    db: Session = Depends(get_db),
+    current: DemoUser = Depends(require_super_admin),
+):
     user = _load_demo_user(user_id, db)
     orders = (
         db.query(Order)
@@ -7073,14 +7673,14 @@ async def view_user(request: Request, user_id: int, db: Session = Depends(get_db
 
 @app.get("/admin/orders/{order_id}", response_class=HTMLResponse)
 async def admin_order_detail(
-    request: Request, order_id: int, db: Session = Depends(get_db)
+    request: Request,
+    order_id: int,
+    db: Session = Depends(get_db),
+    current: DemoUser = Depends(require_super_admin),
 ):
-    current = get_current_user(request)
-    if not current or not current.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     order = db.query(Order).filter(Order.id == order_id).first()
     if not order:
-        return RedirectResponse(url="/admin/users", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/admin/users")
     return render_template(
         "admin_order_detail.html",
         request=request,
@@ -7093,7 +7693,7 @@ async def admin_order_detail(
 async def edit_user(request: Request, user_id: int, db: Session = Depends(get_db)):
     current = get_current_user(request)
     if not current:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     user = _load_demo_user(user_id, db)
     if not (
         current.is_super_admin
@@ -7102,12 +7702,12 @@ async def edit_user(request: Request, user_id: int, db: Session = Depends(get_db
             and any(bid in current.bar_ids for bid in user.bar_ids)
         )
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     return render_template(
         "admin_edit_user.html",
         request=request,
         user=user,
-        bars=bars.values(),
+        bars=bars_snapshot,
         current=current,
     )
 
@@ -7116,7 +7716,7 @@ async def edit_user(request: Request, user_id: int, db: Session = Depends(get_db
 async def update_user(request: Request, user_id: int, db: Session = Depends(get_db)):
     current = get_current_user(request)
     if not current:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     user = _load_demo_user(user_id, db)
     if not (
         current.is_super_admin
@@ -7125,7 +7725,7 @@ async def update_user(request: Request, user_id: int, db: Session = Depends(get_
             and any(bid in current.bar_ids for bid in user.bar_ids)
         )
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     await enforce_csrf(request)
     form = await request.form()
     username = form.get("username")
@@ -7142,10 +7742,27 @@ async def update_user(request: Request, user_id: int, db: Session = Depends(get_
             "admin_edit_user.html",
             request=request,
             user=user,
-            bars=bars.values(),
+            bars=bars_snapshot,
             current=current,
         )
-    db_user = db.query(User).filter(User.id == user_id).first()
+    # Parse credit before anything is mutated so bad input leaves the user as is
+    add_amt = remove_amt = 0.0
+    if current.is_super_admin:
+        try:
+            add_amt = float(add_credit)
+            remove_amt = float(remove_credit)
+        except ValueError:
+            add_amt = math.nan
+        if not (math.isfinite(add_amt) and math.isfinite(remove_amt)):
+            return render_template(
+                "admin_edit_user.html",
+                request=request,
+                user=user,
+                bars=bars_snapshot,
+                current=current,
+                error="Invalid credit amount",
+            )
+    db_user = db.get(User, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     target_is_super_admin = (
@@ -7159,7 +7776,7 @@ async def update_user(request: Request, user_id: int, db: Session = Depends(get_
             "admin_edit_user.html",
             request=request,
             user=user,
-            bars=bars.values(),
+            bars=bars_snapshot,
             current=current,
             error="Super admins cannot be blocked.",
             status_code=400,
@@ -7182,32 +7799,36 @@ async def update_user(request: Request, user_id: int, db: Session = Depends(get_
             "admin_edit_user.html",
             request=request,
             user=user,
-            bars=bars.values(),
+            bars=bars_snapshot,
             current=current,
             error=USERNAME_MESSAGE,
         )
     if username_lower != user.username.lower() and (
         username_lower in users_by_username
-        or db.query(User)
+        or db.query(User.id)
         .filter(func.lower(User.username) == username_lower)
-        .first()
+        .limit(1)
+        .scalar()
+        is not None
     ):
         return render_template(
             "admin_edit_user.html",
             request=request,
             user=user,
-            bars=bars.values(),
+            bars=bars_snapshot,
             current=current,
             error="Username already taken",
         )
-    if email != user.email and (
-        email in users_by_email or db.query(User).filter(User.email == email).first()
+    email = normalize_email(email)
+    if email != normalize_email(user.email) and (
+        email in users_by_email
+        or db.query(User.id).filter(func.lower(User.email) == email).limit(1).scalar() is not None
     ):
         return render_template(
             "admin_edit_user.html",
             request=request,
             user=user,
-            bars=bars.values(),
+            bars=bars_snapshot,
             current=current,
             error="Email already taken",
         )
@@ -7217,43 +7838,38 @@ async def update_user(request: Request, user_id: int, db: Session = Depends(get_
         users_by_username.pop(old_username_lower, None)
     user.username = new_username_display
     users_by_username[username_lower] = user
-    if email != user.email:
-        users_by_email.pop(user.email, None)
-        user.email = email
-        users_by_email[user.email] = user
-    else:
-        user.email = email
+    if email != normalize_email(user.email):
+        users_by_email.pop(normalize_email(user.email), None)
+        users_by_email[email] = user
+    user.email = email
     user.prefix = prefix or ""
     phone_e164 = db_user.phone_e164
     phone_region = db_user.phone_region
     if phone:
         try:
-            RegisterIn.model_validate({"dial_code": prefix, "phone": phone})
+            phone_e164, phone_region = validate_phone_cached(prefix, phone)
         except ValidationError:
             if not allow_override:
                 return render_template(
                     "admin_edit_user.html",
                     request=request,
                     user=user,
-                    bars=bars.values(),
+                    bars=bars_snapshot,
                     current=current,
                     error="Invalid phone number length.",
                     status_code=422,
                 )
-        else:
-            try:
-                phone_e164, phone_region = normalize_phone_or_raise(prefix or "", phone)
-            except HTTPException as exc:
-                if not allow_override:
-                    return render_template(
-                        "admin_edit_user.html",
-                        request=request,
-                        user=user,
-                        bars=bars.values(),
-                        current=current,
-                        error=exc.detail,
-                        status_code=exc.status_code,
-                    )
+        except HTTPException as exc:
+            if not allow_override:
+                return render_template(
+                    "admin_edit_user.html",
+                    request=request,
+                    user=user,
+                    bars=bars_snapshot,
+                    current=current,
+                    error=exc.detail,
+                    status_code=exc.status_code,
+                )
         user.phone = phone or ""
     else:
         user.phone = ""
@@ -7262,23 +7878,10 @@ async def update_user(request: Request, user_id: int, db: Session = Depends(get_
     if not current.is_super_admin:
         role = "bar_admin" if role == "bar_admin" else "bartender"
         bar_ids = current.bar_ids.copy()
-        add_credit = "0"
-        remove_credit = "0"
+    previous_role = user.role
     user.role = role
     user.base_role = role
     user.bar_ids = bar_ids
-    try:
-        add_amt = float(add_credit)
-        remove_amt = float(remove_credit)
-    except (TypeError, ValueError):
-        return render_template(
-            "admin_edit_user.html",
-            request=request,
-            user=user,
-            bars=bars.values(),
-            current=current,
-            error="Invalid credit amount",
-        )
     user.credit = user.credit + add_amt - remove_amt
     db_user.username = new_username_display
     db_user.email = email
@@ -7286,16 +7889,7 @@ async def update_user(request: Request, user_id: int, db: Session = Depends(get_
     db_user.phone = phone or None
     db_user.phone_e164 = phone_e164
     db_user.phone_region = phone_region
-    role_enum_map = {
-        "super_admin": RoleEnum.SUPERADMIN,
-        "bar_admin": RoleEnum.BARADMIN,
-        "bartender": RoleEnum.BARTENDER,
-        "customer": RoleEnum.CUSTOMER,
-        "display": RoleEnum.DISPLAY,
-        "blocked": RoleEnum.BLOCKED,
-        "ip_block": RoleEnum.IPBLOCK,
-    }
-    role_enum = role_enum_map.get(role, RoleEnum.CUSTOMER)
+    role_enum = ROLE_ENUM_MAP.get(role, RoleEnum.CUSTOMER)
     db_user.role = role_enum
     db_user.credit = Decimal(str(user.credit))
     if role in {"blocked", "ip_block"}:
@@ -7305,46 +7899,64 @@ async def update_user(request: Request, user_id: int, db: Session = Depends(get_
         db.query(UserCart).filter(UserCart.user_id == user_id).delete(
             synchronize_session=False
         )
-    # Update user-bar role association: remove previous roles then add new assignment
-    db.query(UserBarRole).filter(UserBarRole.user_id == user_id).delete(
-        synchronize_session=False
-    )
-    db.flush()
-    for bid in user.bar_ids:
-        db.add(
-            UserBarRole(
-                user_id=user_id,
-                bar_id=bid,
-                role=role_enum,
-            )
+    # Update user-bar role association: only touch rows whose bar changed
+    existing_bar_ids = {
+        row.bar_id
+        for row in db.query(UserBarRole.bar_id).filter(UserBarRole.user_id == user_id)
+    }
+    new_bar_ids = set(user.bar_ids)
+    removed_bar_ids = existing_bar_ids - new_bar_ids
+    added_bar_ids = new_bar_ids - existing_bar_ids
+    if removed_bar_ids:
+        db.query(UserBarRole).filter(
+            UserBarRole.user_id == user_id,
+            UserBarRole.bar_id.in_(removed_bar_ids),
+        ).delete(synchronize_session=False)
+    if existing_bar_ids & new_bar_ids:
+        db.query(UserBarRole).filter(
+            UserBarRole.user_id == user_id,
+            UserBarRole.role != role_enum,
+        ).update({UserBarRole.role: role_enum}, synchronize_session=False)
+    if added_bar_ids:
+        db.execute(
+            insert(UserBarRole),
+            [
+                {"user_id": user_id, "bar_id": bid, "role": role_enum}
+                for bid in sorted(added_bar_ids)
+            ],
         )
     db.commit()
     # Update in-memory user caches to reflect new data
-    users[user.id] = user
-    users_by_username[user.username.lower()] = user
-    users_by_email[user.email] = user
-    # Update in-memory bar assignments
-    for b in bars.values():
-        if user_id in b.bar_admin_ids:
-            b.bar_admin_ids.remove(user_id)
-        if user_id in b.bartender_ids:
-            b.bartender_ids.remove(user_id)
-    for bid in user.bar_ids:
-        target = bars.get(bid) or refresh_bar_from_db(bid, db)
-        if role == "bar_admin":
-            if user_id not in target.bar_admin_ids:
-                target.bar_admin_ids.append(user_id)
-        elif role == "bartender":
-            if user_id not in target.bartender_ids:
-                target.bartender_ids.append(user_id)
-    return RedirectResponse(url="/admin/users", status_code=status.HTTP_303_SEE_OTHER)
+    cache_user(user)
+    # Update in-memory bar assignments, touching only bars that changed
+    old_assignments = set(bar_ids_by_staff.get(user_id, ()))
+    new_assignments = (
+        set(user.bar_ids) if role in {"bar_admin", "bartender"} else set()
+    )
+    for bid in old_assignments - new_assignments:
+        previous = bars.get(bid)
+        if previous:
+            previous.remove_staff(user_id)
+    for bid in new_assignments:
+        if bid in old_assignments and role == previous_role:
+            continue
+        target = bars.get(bid)
+        if target is None and bid not in old_assignments:
+            target = refresh_bar_from_db(bid, db)
+        if target:
+            # Also moves the user between the admin and bartender sets of
+            # bars they keep when only the role changed.
+            target.add_staff(user_id, role)
+    return see_other("/admin/users")
 
 
 @app.post("/admin/users/{user_id}/delete")
-async def delete_user(request: Request, user_id: int, db: Session = Depends(get_db)):
-    current = get_current_user(request)
-    if not current or not current.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+async def delete_user(
+    request: Request,
+    user_id: int,
+    db: Session = Depends(get_db),
+    current: DemoUser = Depends(require_super_admin),
+):
     await enforce_csrf(request)
     db_user = db.get(User, user_id)
     if not db_user:
@@ -7397,13 +8009,12 @@ async def delete_user(request: Request, user_id: int, db: Session = Depends(get_
     demo = users.pop(user_id, None)
     if demo:
         users_by_username.pop(demo.username.lower(), None)
-        users_by_email.pop(demo.email, None)
-    for b in bars.values():
-        if user_id in b.bar_admin_ids:
-            b.bar_admin_ids.remove(user_id)
-        if user_id in b.bartender_ids:
-            b.bartender_ids.remove(user_id)
-    return RedirectResponse(url="/admin/users", status_code=status.HTTP_303_SEE_OTHER)
+        users_by_email.pop(normalize_email(demo.email), None)
+    for bid in list(bar_ids_by_staff.get(user_id, ())):
+        previous = bars.get(bid)
+        if previous:
+            previous.remove_staff(user_id)
+    return see_other("/admin/users")
 
 
 @app.get("/admin/users/{user_id}/password", response_class=HTMLResponse)
@@ -7412,7 +8023,7 @@ async def admin_password_form(
 ):
     current = get_current_user(request)
     if not current:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     user = _load_demo_user(user_id, db)
     if not (
         current.is_super_admin
@@ -7421,7 +8032,7 @@ async def admin_password_form(
             and any(bid in current.bar_ids for bid in user.bar_ids)
         )
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     return render_template(
         "admin_change_user_password.html", request=request, user=user
     )
@@ -7433,7 +8044,7 @@ async def admin_password_update(
 ):
     current = get_current_user(request)
     if not current:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     user = _load_demo_user(user_id, db)
     if not (
         current.is_super_admin
@@ -7442,7 +8053,7 @@ async def admin_password_update(
             and any(bid in current.bar_ids for bid in user.bar_ids)
         )
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     await enforce_csrf(request)
     form = await request.form()
     password = form.get("password") or ""
@@ -7465,17 +8076,15 @@ async def admin_password_update(
         return render_form("Password is too common")
     if password != confirm:
         return render_form("Passwords do not match")
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = db.get(User, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
-    user.password_hash = hash_password(password)
+    user.password_hash = await to_thread.run_sync(hash_password, password)
     db_user.password_hash = user.password_hash
     if user.email:
         _clear_login_failures(db, [("email", user.email.lower())])
     db.commit()
-    return RedirectResponse(
-        url=f"/admin/users/edit/{user_id}", status_code=status.HTTP_303_SEE_OTHER
-    )
+    return see_other(f"/admin/users/edit/{user_id}")
 
 
 @app.get("/admin/notifications", response_class=HTMLResponse)
@@ -7484,10 +8093,8 @@ async def admin_notifications_view(
     message: str | None = None,
     error: str | None = None,
     db: Session = Depends(get_db),
+    current: DemoUser = Depends(require_super_admin),
 ):
-    current = get_current_user(request)
-    if not current or not current.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     notes = (
         db.query(NotificationLog)
         .options(
@@ -7514,10 +8121,8 @@ async def admin_notifications_new(
     request: Request,
     error: str | None = None,
     db: Session = Depends(get_db),
+    current: DemoUser = Depends(require_super_admin),
 ):
-    current = get_current_user(request)
-    if not current or not current.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     users = db.query(User).order_by(User.id).all()
     bars = db.query(BarModel).order_by(BarModel.name).all()
     return render_template(
@@ -7535,11 +8140,11 @@ async def admin_notifications_new(
 
 @app.get("/admin/notifications/welcome", response_class=HTMLResponse)
 async def admin_welcome_get(
-    request: Request, error: str | None = None, db: Session = Depends(get_db)
+    request: Request,
+    error: str | None = None,
+    db: Session = Depends(get_db),
+    current: DemoUser = Depends(require_super_admin),
 ):
-    current = get_current_user(request)
-    if not current or not current.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     await enforce_csrf(request)
     wm = db.get(WelcomeMessage, 1)
     subject_translations = (
@@ -7569,10 +8174,8 @@ async def admin_welcome_get(
 async def admin_welcome_post(
     request: Request,
     db: Session = Depends(get_db),
+    current: DemoUser = Depends(require_super_admin),
 ):
-    current = get_current_user(request)
-    if not current or not current.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     await enforce_csrf(request)
     wm = db.get(WelcomeMessage, 1)
     existing_subjects = (
@@ -7588,10 +8191,7 @@ async def admin_welcome_post(
     form = await request.form()
     base_subject = (form.get("subject") or "").strip()
     if base_subject and len(base_subject) > 30:
-        return RedirectResponse(
-            url="/admin/notifications/welcome?error=Subject+too+long",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other("/admin/notifications/welcome?error=Subject+too+long")
     base_language = (
         normalize_language(getattr(request.state, "language_code", None))
         or DEFAULT_LANGUAGE
@@ -7605,20 +8205,11 @@ async def admin_welcome_post(
     if not english_subject and base_subject:
         english_subject = base_subject
     if not english_subject:
-        return RedirectResponse(
-            url="/admin/notifications/welcome?error=Subject+required",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other("/admin/notifications/welcome?error=Subject+required")
     if len(english_subject) > 30:
-        return RedirectResponse(
-            url="/admin/notifications/welcome?error=Subject+too+long",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other("/admin/notifications/welcome?error=Subject+too+long")
     if base_language_subject and len(base_language_subject) > 30:
-        return RedirectResponse(
-            url="/admin/notifications/welcome?error=Subject+too+long",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other("/admin/notifications/welcome?error=Subject+too+long")
     if not base_language_subject:
         base_language_subject = english_subject
     base_subject = base_language_subject or english_subject
@@ -7629,10 +8220,7 @@ async def admin_welcome_post(
     if not english_body:
         english_body = existing_bodies.get(DEFAULT_LANGUAGE, "").strip()
     if not english_body:
-        return RedirectResponse(
-            url="/admin/notifications/welcome?error=Message+required",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other("/admin/notifications/welcome?error=Message+required")
     base_body = base_language_body or english_body
     subject_translations: Dict[str, str] = {}
     body_translations: Dict[str, str] = {}
@@ -7645,10 +8233,7 @@ async def admin_welcome_post(
                 subject_value = base_subject
         if subject_value:
             if len(subject_value) > 30:
-                return RedirectResponse(
-                    url="/admin/notifications/welcome?error=Subject+too+long",
-                    status_code=status.HTTP_303_SEE_OTHER,
-                )
+                return see_other("/admin/notifications/welcome?error=Subject+too+long")
             subject_translations[code] = subject_value
         body_value = (form.get(f"body_{code}") or "").strip()
         if not body_value:
@@ -7674,10 +8259,7 @@ async def admin_welcome_post(
     wm.subject = subject_translations.get(DEFAULT_LANGUAGE, english_subject)
     wm.body = body_translations.get(DEFAULT_LANGUAGE, base_body)
     db.commit()
-    return RedirectResponse(
-        url="/admin/notifications?message=Saved",
-        status_code=status.HTTP_303_SEE_OTHER,
-    )
+    return see_other("/admin/notifications?message=Saved")
 
 
 @app.post("/admin/notifications", response_class=HTMLResponse)
@@ -7690,10 +8272,8 @@ async def admin_notifications_send(
     image: UploadFile | None = File(None),
     attachment: UploadFile | None = File(None),
     db: Session = Depends(get_db),
+    current: DemoUser = Depends(require_super_admin),
 ):
-    current = get_current_user(request)
-    if not current or not current.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     await enforce_csrf(request)
     recipient_ids: set[int] = set()
     if target == "all":
@@ -7708,10 +8288,7 @@ async def admin_notifications_send(
             .distinct()
         }
     else:
-        return RedirectResponse(
-            url="/admin/notifications/new?error=Invalid+target",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other("/admin/notifications/new?error=Invalid+target")
     form = await request.form()
     base_language = (
         normalize_language(getattr(request.state, "language_code", None))
@@ -7722,20 +8299,11 @@ async def admin_notifications_send(
     if not english_subject and base_subject:
         english_subject = base_subject
     if not english_subject:
-        return RedirectResponse(
-            url="/admin/notifications/new?error=Subject+required",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other("/admin/notifications/new?error=Subject+required")
     if len(english_subject) > 30:
-        return RedirectResponse(
-            url="/admin/notifications/new?error=Subject+too+long",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other("/admin/notifications/new?error=Subject+too+long")
     if base_subject and len(base_subject) > 30:
-        return RedirectResponse(
-            url="/admin/notifications/new?error=Subject+too+long",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other("/admin/notifications/new?error=Subject+too+long")
     if not base_subject:
         base_subject = english_subject
     english_body = (form.get(f"body_{DEFAULT_LANGUAGE}") or "").strip()
@@ -7743,10 +8311,7 @@ async def admin_notifications_send(
     if not english_body and base_body:
         english_body = base_body
     if not english_body:
-        return RedirectResponse(
-            url="/admin/notifications/new?error=Message+required",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other("/admin/notifications/new?error=Message+required")
     if not base_body:
         base_body = english_body
     subject_translations: Dict[str, str] = {}
@@ -7760,10 +8325,7 @@ async def admin_notifications_send(
                 subject_value = base_subject
         if subject_value:
             if len(subject_value) > 30:
-                return RedirectResponse(
-                    url="/admin/notifications/new?error=Subject+too+long",
-                    status_code=status.HTTP_303_SEE_OTHER,
-                )
+                return see_other("/admin/notifications/new?error=Subject+too+long")
             subject_translations[code] = subject_value
         body_value = (form.get(f"body_{code}") or "").strip()
         if not body_value:
@@ -7780,44 +8342,28 @@ async def admin_notifications_send(
     if image and image.filename:
         image_mime = (image.content_type or "").lower()
         if image_mime not in ALLOWED_NOTIFICATION_IMAGE_TYPES:
-            return RedirectResponse(
-                url="/admin/notifications/new?error=Unsupported+image+type",
-                status_code=status.HTTP_303_SEE_OTHER,
-            )
+            return see_other("/admin/notifications/new?error=Unsupported+image+type")
         image_bytes = await image.read(MAX_NOTIFICATION_IMAGE_BYTES + 1)
         if len(image_bytes) > MAX_NOTIFICATION_IMAGE_BYTES:
-            return RedirectResponse(
-                url="/admin/notifications/new?error=Image+too+large",
-                status_code=status.HTTP_303_SEE_OTHER,
-            )
+            return see_other("/admin/notifications/new?error=Image+too+large")
         if not image_bytes:
-            return RedirectResponse(
-                url="/admin/notifications/new?error=Image+empty",
-                status_code=status.HTTP_303_SEE_OTHER,
-            )
+            return see_other("/admin/notifications/new?error=Image+empty")
         await image.close()
     attachment_bytes = None
     attachment_filename = None
     if attachment and attachment.filename:
         attachment_mime = (attachment.content_type or "").lower()
         if attachment_mime not in ALLOWED_NOTIFICATION_ATTACHMENT_TYPES:
-            return RedirectResponse(
-                url="/admin/notifications/new?error=Unsupported+attachment+type",
-                status_code=status.HTTP_303_SEE_OTHER,
+            return see_other(
+                "/admin/notifications/new?error=Unsupported+attachment+type"
             )
         attachment_bytes = await attachment.read(
             MAX_NOTIFICATION_ATTACHMENT_BYTES + 1
         )
         if len(attachment_bytes) > MAX_NOTIFICATION_ATTACHMENT_BYTES:
-            return RedirectResponse(
-                url="/admin/notifications/new?error=Attachment+too+large",
-                status_code=status.HTTP_303_SEE_OTHER,
-            )
+            return see_other("/admin/notifications/new?error=Attachment+too+large")
         if not attachment_bytes:
-            return RedirectResponse(
-                url="/admin/notifications/new?error=Attachment+empty",
-                status_code=status.HTTP_303_SEE_OTHER,
-            )
+            return see_other("/admin/notifications/new?error=Attachment+empty")
         attachment_filename = sanitize_notification_filename(attachment.filename)
         await attachment.close()
     if not image_bytes:
@@ -7826,10 +8372,7 @@ async def admin_notifications_send(
         attachment_filename = None
     normalized_link_url = normalize_notification_link(link_url)
     if (link_url or "").strip() and not normalized_link_url:
-        return RedirectResponse(
-            url="/admin/notifications/new?error=Invalid+link+URL",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
+        return see_other("/admin/notifications/new?error=Invalid+link+URL")
     now = datetime.utcnow()
     log = NotificationLog(
         sender_id=current.id,
@@ -7863,19 +8406,16 @@ async def admin_notifications_send(
         )
         db.add(note)
     db.commit()
-    return RedirectResponse(
-        url="/admin/notifications?message=Sent",
-        status_code=status.HTTP_303_SEE_OTHER,
-    )
+    return see_other("/admin/notifications?message=Sent")
 
 
 @app.get("/admin/notifications/{log_id}", response_class=HTMLResponse)
 async def admin_notification_detail(
-    log_id: int, request: Request, db: Session = Depends(get_db)
+    log_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current: DemoUser = Depends(require_super_admin),
 ):
-    current = get_current_user(request)
-    if not current or not current.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     log = (
         db.query(NotificationLog)
         .options(
@@ -7906,11 +8446,11 @@ async def admin_notification_detail(
 
 @app.post("/admin/notifications/{log_id}/delete", response_class=HTMLResponse)
 async def admin_notification_delete(
-    log_id: int, request: Request, db: Session = Depends(get_db)
+    log_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current: DemoUser = Depends(require_super_admin),
 ):
-    current = get_current_user(request)
-    if not current or not current.is_super_admin:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     await enforce_csrf(request)
     log = db.query(NotificationLog).filter(NotificationLog.id == log_id).first()
     if not log:
@@ -7920,17 +8460,14 @@ async def admin_notification_delete(
     )
     db.delete(log)
     db.commit()
-    return RedirectResponse(
-        url="/admin/notifications?message=Deleted",
-        status_code=status.HTTP_303_SEE_OTHER,
-    )
+    return see_other("/admin/notifications?message=Deleted")
 
 
 @app.get("/notifications", response_class=HTMLResponse)
 async def notifications_view(request: Request, db: Session = Depends(get_db)):
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     translator_for_request(request)
     notes = (
         db.query(Notification)
@@ -7955,7 +8492,7 @@ async def notification_detail(
 ):
     user = get_current_user(request)
     if not user:
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     translator_for_request(request)
     note = (
         db.query(Notification)
@@ -8046,8 +8583,9 @@ async def bar_manage_categories(
         user.is_super_admin
         or (bar_id in user.bar_ids and (user.is_bar_admin or user.is_bartender))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
-    categories = sorted(bar.categories.values(), key=lambda c: c.display_order)
+        return see_other("/")
+    # refresh_bar_from_db loads categories already ordered by sort_order
+    categories = list(bar.categories.values())
     return render_template(
         "bar_manage_categories.html",
         request=request,
@@ -8068,7 +8606,7 @@ async def bar_new_category_form(
         user.is_super_admin
         or (bar_id in user.bar_ids and (user.is_bar_admin or user.is_bartender))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     return render_template("bar_new_category.html", request=request, bar=bar)
 
 
@@ -8084,7 +8622,7 @@ async def bar_new_category(
         user.is_super_admin
         or (bar_id in user.bar_ids and (user.is_bar_admin or user.is_bartender))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     await enforce_csrf(request)
     form = await request.form()
     base_name = (form.get("name") or "").strip()
@@ -8153,10 +8691,8 @@ async def bar_new_category(
         name_translations=normalised_names,
         description_translations=normalised_descriptions,
     )
-    bar.categories[category.id] = category
-    return RedirectResponse(
-        url=f"/bar/{bar_id}/categories", status_code=status.HTTP_303_SEE_OTHER
-    )
+    bar.add_category(category)
+    return see_other(f"/bar/{bar_id}/categories")
 
 
 @app.post("/bar/{bar_id}/categories/{category_id}/delete")
@@ -8168,7 +8704,7 @@ async def bar_delete_category(
         user.is_super_admin
         or (bar_id in user.bar_ids and (user.is_bar_admin or user.is_bartender))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     bar = refresh_bar_from_db(bar_id, db)
     if not bar:
         raise HTTPException(status_code=404, detail="Bar not found")
@@ -8183,13 +8719,8 @@ async def bar_delete_category(
         synchronize_session=False
     )
     db.commit()
-    bar.categories.pop(category_id, None)
-    bar.products = {
-        pid: p for pid, p in bar.products.items() if p.category_id != category_id
-    }
-    return RedirectResponse(
-        url=f"/bar/{bar_id}/categories", status_code=status.HTTP_303_SEE_OTHER
-    )
+    bar.remove_category(category_id)
+    return see_other(f"/bar/{bar_id}/categories")
 
 
 @app.get("/bar/{bar_id}/categories/{category_id}/products", response_class=HTMLResponse)
@@ -8201,17 +8732,14 @@ async def bar_category_products(
         user.is_super_admin
         or (bar_id in user.bar_ids and (user.is_bar_admin or user.is_bartender))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     bar = refresh_bar_from_db(bar_id, db)
     if not bar:
         raise HTTPException(status_code=404, detail="Bar not found")
     category = bar.categories.get(category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
-    products = sorted(
-        [p for p in bar.products.values() if p.category_id == category_id],
-        key=lambda p: p.display_order,
-    )
+    products = [p for p in bar.products.values() if p.category_id == category_id]
     for p in products:
         p.photo_url = make_absolute_url(p.photo_url, request)
     return render_template(
@@ -8235,7 +8763,7 @@ async def bar_new_product_form(
         user.is_super_admin
         or (bar_id in user.bar_ids and (user.is_bar_admin or user.is_bartender))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     bar = refresh_bar_from_db(bar_id, db)
     if not bar:
         raise HTTPException(status_code=404, detail="Bar not found")
@@ -8256,7 +8784,7 @@ async def bar_new_product(
         user.is_super_admin
         or (bar_id in user.bar_ids and (user.is_bar_admin or user.is_bartender))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     bar = refresh_bar_from_db(bar_id, db)
     if not bar:
         raise HTTPException(status_code=404, detail="Bar not found")
@@ -8293,9 +8821,8 @@ async def bar_new_product(
             error="All fields are required",
         )
     try:
-        price_val = float(price)
         price_decimal = Decimal(price)
-    except ValueError:
+    except (InvalidOperation, ValueError):
         return render_template(
             "bar_new_product.html",
             request=request,
@@ -8324,12 +8851,8 @@ async def bar_new_product(
     }
     db.add(db_item)
     db.commit()
-    db.refresh(db_item)
     refresh_bar_from_db(bar_id, db)
-    return RedirectResponse(
-        url=f"/bar/{bar_id}/categories/{category_id}/products",
-        status_code=status.HTTP_303_SEE_OTHER,
-    )
+    return see_other(f"/bar/{bar_id}/categories/{category_id}/products")
 
 
 @app.post("/bar/{bar_id}/categories/{category_id}/products/{product_id}/delete")
@@ -8360,11 +8883,8 @@ async def bar_delete_product(
     await enforce_csrf(request)
     db.query(MenuItem).filter(MenuItem.id == product_id).delete()
     db.commit()
-    bar.products.pop(product_id, None)
-    return RedirectResponse(
-        url=f"/bar/{bar_id}/categories/{category_id}/products",
-        status_code=status.HTTP_303_SEE_OTHER,
-    )
+    bar.remove_product(product_id)
+    return see_other(f"/bar/{bar_id}/categories/{category_id}/products")
 
 
 @app.get(
@@ -8441,7 +8961,7 @@ async def bar_edit_product(
         user.is_super_admin
         or (bar_id in user.bar_ids and (user.is_bar_admin or user.is_bartender))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     bar = refresh_bar_from_db(bar_id, db)
     if not bar:
         raise HTTPException(status_code=404, detail="Bar not found")
@@ -8527,18 +9047,19 @@ async def bar_edit_product(
             product.description_translations = product_description_translations
     if price:
         try:
-            price_val = float(price)
             price_dec = Decimal(price)
-            product.price = price_val
-            db_item.price_chf = price_dec
-        except ValueError:
+        except (InvalidOperation, ValueError):
             pass
+        else:
+            product.price = float(price_dec)
+            db_item.price_chf = price_dec
     try:
         order_val = int(display_order)
         product.display_order = order_val
         db_item.sort_order = order_val
     except ValueError:
         pass
+    bar.invalidate_menu()
     if image_bytes is not None and image_mime is not None:
         img = db.query(ProductImage).filter_by(product_id=db_item.id).first()
         if img:
@@ -8553,12 +9074,8 @@ async def bar_edit_product(
     product.photo_url = f"/api/products/{db_item.id}/image"
     db_item.photo = None
     db.commit()
-    db.refresh(db_item)
     refresh_bar_from_db(bar_id, db)
-    return RedirectResponse(
-        url=f"/bar/{bar_id}/categories/{category_id}/products",
-        status_code=status.HTTP_303_SEE_OTHER,
-    )
+    return see_other(f"/bar/{bar_id}/categories/{category_id}/products")
 
 
 @app.get(
@@ -8589,7 +9106,7 @@ async def bar_edit_product_name_form(
         user.is_super_admin
         or (bar_id in user.bar_ids and (user.is_bar_admin or user.is_bartender))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     product = bar.products.get(product_id)
     name_translations = normalise_translation_map(
         db_item.name_translations, db_item.name or ""
@@ -8651,7 +9168,7 @@ async def bar_edit_product_name(
         user.is_super_admin
         or (bar_id in user.bar_ids and (user.is_bar_admin or user.is_bartender))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     await enforce_csrf(request)
     form = await request.form()
     translations: Dict[str, str] = {}
@@ -8709,9 +9226,8 @@ async def bar_edit_product_name(
         product.name_translations = normalised
     db.commit()
     refresh_bar_from_db(bar_id, db)
-    return RedirectResponse(
-        url=f"/bar/{bar_id}/categories/{category_id}/products/{product_id}/edit",
-        status_code=status.HTTP_303_SEE_OTHER,
+    return see_other(
+        f"/bar/{bar_id}/categories/{category_id}/products/{product_id}/edit"
     )
 
 
@@ -8743,7 +9259,7 @@ async def bar_edit_product_description_form(
         user.is_super_admin
         or (bar_id in user.bar_ids and (user.is_bar_admin or user.is_bartender))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     product = bar.products.get(product_id)
     if not product:
         name_translations = normalise_translation_map(
@@ -8816,7 +9332,7 @@ async def bar_edit_product_description(
         user.is_super_admin
         or (bar_id in user.bar_ids and (user.is_bar_admin or user.is_bartender))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     await enforce_csrf(request)
     form = await request.form()
     translations: Dict[str, str] = {}
@@ -8876,9 +9392,8 @@ async def bar_edit_product_description(
         product.description_translations = normalised
     db.commit()
     refresh_bar_from_db(bar_id, db)
-    return RedirectResponse(
-        url=f"/bar/{bar_id}/categories/{category_id}/products/{product_id}/edit",
-        status_code=status.HTTP_303_SEE_OTHER,
+    return see_other(
+        f"/bar/{bar_id}/categories/{category_id}/products/{product_id}/edit"
     )
 
 
@@ -8891,7 +9406,7 @@ async def bar_edit_category_form(
         user.is_super_admin
         or (bar_id in user.bar_ids and (user.is_bar_admin or user.is_bartender))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     bar = refresh_bar_from_db(bar_id, db)
     if not bar:
         raise HTTPException(status_code=404, detail="Bar not found")
@@ -8912,7 +9427,7 @@ async def bar_edit_category(
         user.is_super_admin
         or (bar_id in user.bar_ids and (user.is_bar_admin or user.is_bartender))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     bar = refresh_bar_from_db(bar_id, db)
     if not bar:
         raise HTTPException(status_code=404, detail="Bar not found")
@@ -8975,11 +9490,10 @@ async def bar_edit_category(
             db_category.sort_order = order_val
     except ValueError:
         pass
+    bar.invalidate_menu()
     if db_category:
         db.commit()
-    return RedirectResponse(
-        url=f"/bar/{bar_id}/categories", status_code=status.HTTP_303_SEE_OTHER
-    )
+    return see_other(f"/bar/{bar_id}/categories")
 
 
 @app.get(
@@ -8994,7 +9508,7 @@ async def bar_edit_category_name_form(
         user.is_super_admin
         or (bar_id in user.bar_ids and (user.is_bar_admin or user.is_bartender))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     bar = refresh_bar_from_db(bar_id, db)
     if not bar:
         raise HTTPException(status_code=404, detail="Bar not found")
@@ -9024,7 +9538,7 @@ async def bar_edit_category_name(
         user.is_super_admin
         or (bar_id in user.bar_ids and (user.is_bar_admin or user.is_bartender))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     bar = refresh_bar_from_db(bar_id, db)
     if not bar:
         raise HTTPException(status_code=404, detail="Bar not found")
@@ -9063,10 +9577,7 @@ async def bar_edit_category_name(
         db_category.name_translations = normalised
         db.commit()
     refresh_bar_from_db(bar_id, db)
-    return RedirectResponse(
-        url=f"/bar/{bar_id}/categories/{category_id}/edit",
-        status_code=status.HTTP_303_SEE_OTHER,
-    )
+    return see_other(f"/bar/{bar_id}/categories/{category_id}/edit")
 
 
 @app.get(
@@ -9081,7 +9592,7 @@ async def bar_edit_category_description_form(
         user.is_super_admin
         or (bar_id in user.bar_ids and (user.is_bar_admin or user.is_bartender))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     bar = refresh_bar_from_db(bar_id, db)
     if not bar:
         raise HTTPException(status_code=404, detail="Bar not found")
@@ -9115,7 +9626,7 @@ async def bar_edit_category_description(
         user.is_super_admin
         or (bar_id in user.bar_ids and (user.is_bar_admin or user.is_bartender))
     ):
-        return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return see_other("/")
     bar = refresh_bar_from_db(bar_id, db)
     if not bar:
         raise HTTPException(status_code=404, detail="Bar not found")
@@ -9154,7 +9665,4 @@ async def bar_edit_category_description(
         db_category.description_translations = normalised
         db.commit()
     refresh_bar_from_db(bar_id, db)
-    return RedirectResponse(
-        url=f"/bar/{bar_id}/categories/{category_id}/edit",
-        status_code=status.HTTP_303_SEE_OTHER,
-    )
+    return see_other(f"/bar/{bar_id}/categories/{category_id}/edit")
@@ -14,9 +14,11 @@ from sqlalchemy import (
     String,
     Text,
     Float,
+    Index,
     LargeBinary,
     JSON,
     UniqueConstraint,
+    func,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB, BIGINT
@@ -61,6 +63,11 @@ class User(Base):
 
     bar_roles = relationship("UserBarRole", back_populates="user")
 
+    __table_args__ = (
+        Index("ix_users_username_lower", func.lower(username)),
+        Index("ix_users_email_lower", func.lower(email)),
+    )
+
 
 class UserCart(Base):
     __tablename__ = "user_carts"
@@ -96,8 +103,17 @@ class Bar(Base):
     ordering_paused = Column(Boolean, default=False)
     bar_categories = Column(Text)
 
-    categories = relationship("Category", back_populates="bar")
-    menu_items = relationship("MenuItem", back_populates="bar")
+    # Collections load in display order so callers can skip re-sorting them.
+    categories = relationship(
+        "Category",
+        back_populates="bar",
+        order_by=lambda: [func.coalesce(Category.sort_order, 0), Category.id],
+    )
+    menu_items = relationship(
+        "MenuItem",
+        back_populates="bar",
+        order_by=lambda: [func.coalesce(MenuItem.sort_order, 0), MenuItem.id],
+    )
     tables = relationship("Table", back_populates="bar")
 
 
@@ -446,6 +462,8 @@ class Notification(Base):
     sender = relationship("User", foreign_keys=[sender_id])
     log = relationship("NotificationLog", foreign_keys=[log_id])
 
+    __table_args__ = (Index("ix_notifications_user_read", "user_id", "read"),)
+
 
 class NotificationLog(Base):
     __tablename__ = "notification_logs"
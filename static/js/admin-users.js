@@ -35,28 +35,24 @@
     const run = debounce(applyFilter, 120);
     input.addEventListener('input', run);
 
+    // Typing filters the rows on this page; submitting the form (Enter)
+    // searches every user on the server via ?q=.
     const form = document.querySelector('.users-search');
-    if(form){
-      form.addEventListener('submit', (event) => {
-        event.preventDefault();
-      });
-    }
+    const qs = new URLSearchParams(window.location.search);
+    const preset = qs.get('q');
 
     const clearButton = form ? form.querySelector('.clear') : document.querySelector('.users-search .clear');
     if(clearButton){
       clearButton.addEventListener('click', () => {
         input.value = '';
+        if(preset){
+          window.location.assign(window.location.pathname);
+          return;
+        }
         applyFilter();
         input.focus();
       });
     }
-
-    const qs = new URLSearchParams(window.location.search);
-    const preset = qs.get('q');
-    if(preset){
-      input.value = preset;
-      applyFilter();
-    }
   }
 
   if(document.readyState === 'loading'){
@@ -44,3 +44,30 @@ def test_superadmin_can_create_user_with_email_password():
         new_user = db.query(User).filter(User.email == "new@example.com").first()
         db.close()
         assert new_user is not None
+
+
+def test_superadmin_new_user_gets_free_username_suffix():
+    setup_db()
+    db = SessionLocal()
+    # Enough taken names that the free suffix lies past the first probe batch.
+    db.add_all(
+        [
+            User(username=name, email=f"{name}@one.example", password_hash="x")
+            for name in ["dup"] + [f"dup{n}" for n in range(1, 21)]
+        ]
+    )
+    db.commit()
+    db.close()
+    with TestClient(app) as client:
+        load_bars_from_db()
+        client.post("/login", data={"email": "admin@example.com", "password": "ChangeMe!123"})
+        resp = client.post(
+            "/admin/users/new",
+            data={"email": "dup@two.example", "password": "pass"},
+            follow_redirects=False,
+        )
+        assert resp.status_code == 303
+        db = SessionLocal()
+        new_user = db.query(User).filter(User.email == "dup@two.example").first()
+        db.close()
+        assert new_user.username == "dup21"
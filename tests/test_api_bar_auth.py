@@ -1,3 +1,4 @@
+import hashlib
 import json
 import os
 import sys
@@ -115,3 +116,23 @@ def test_super_admin_can_create_bar():
         assert payload["slug"] == "admin-bar"
     finally:
         db.close()
+
+
+def test_seed_super_admin_upgrades_legacy_hash():
+    reset_db()
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.email == "admin@example.com").one()
+        admin.password_hash = hashlib.sha256(b"ChangeMe!123").hexdigest()
+        db.commit()
+    finally:
+        db.close()
+
+    seed_super_admin()
+
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.email == "admin@example.com").one()
+        assert admin.password_hash.startswith("$argon2")
+    finally:
+        db.close()
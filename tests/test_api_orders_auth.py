@@ -129,3 +129,30 @@ def test_non_customer_cannot_create_order():
         }
         resp = client.post('/api/orders', json=payload)
         assert resp.status_code == 403
+
+
+def test_create_order_with_repeated_and_unknown_items():
+    setup_db()
+    bar_id, item_id = seed_menu()
+    customer = create_user('repeat@example.com')
+
+    with TestClient(app) as client:
+        client.post('/login', data={'email': customer.email, 'password': 'pass'})
+        payload = {
+            'bar_id': bar_id,
+            'items': [
+                {'menu_item_id': item_id, 'qty': 1},
+                {'menu_item_id': item_id, 'qty': 2},
+            ],
+        }
+        resp = client.post('/api/orders', json=payload)
+        assert resp.status_code == 201
+        db = SessionLocal()
+        order = db.query(Order).first()
+        assert len(order.items) == 2
+        assert float(order.subtotal) == 15.0
+        db.close()
+
+        payload['items'].append({'menu_item_id': item_id + 999, 'qty': 1})
+        resp = client.post('/api/orders', json=payload)
+        assert resp.status_code == 404
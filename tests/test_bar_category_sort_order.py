@@ -193,3 +193,92 @@ def test_category_edit_form_does_not_change_name():
     assert db_category.name == "Drinks"
     assert db_category.name_translations["en"] == "Drinks"
     db.close()
+
+
+def test_manage_categories_lists_in_sort_order():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    bars.clear()
+    users.clear()
+    users_by_email.clear()
+    users_by_username.clear()
+
+    db = SessionLocal()
+    bar = BarModel(name="OrderBar", slug="orderbar")
+    db.add(bar)
+    db.commit()
+    db.refresh(bar)
+    bar_id = bar.id
+    db.add_all(
+        [
+            CategoryModel(bar_id=bar_id, name="Third", sort_order=3),
+            CategoryModel(bar_id=bar_id, name="First", sort_order=1),
+            CategoryModel(bar_id=bar_id, name="Second", sort_order=2),
+        ]
+    )
+    db.commit()
+    db.close()
+
+    with TestClient(app) as client:
+        _login(client)
+        resp = client.get(f"/bar/{bar_id}/categories")
+        assert resp.status_code == 200
+        text = resp.text
+        assert text.index("First") < text.index("Second") < text.index("Third")
+
+
+def test_bar_page_reflects_category_reorder():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    bars.clear()
+    users.clear()
+    users_by_email.clear()
+    users_by_username.clear()
+
+    db = SessionLocal()
+    bar = BarModel(name="MenuBar", slug="menubar")
+    db.add(bar)
+    db.commit()
+    db.refresh(bar)
+    bar_id = bar.id
+    early = CategoryModel(bar_id=bar_id, name="Early", sort_order=1)
+    late = CategoryModel(bar_id=bar_id, name="Late", sort_order=2)
+    db.add_all([early, late])
+    db.commit()
+    early_id = early.id
+    db.add_all(
+        [
+            MenuItem(
+                bar_id=bar_id,
+                category_id=early_id,
+                name="EarlyItem",
+                description="d",
+                price_chf=Decimal("3.00"),
+            ),
+            MenuItem(
+                bar_id=bar_id,
+                category_id=late.id,
+                name="LateItem",
+                description="d",
+                price_chf=Decimal("4.00"),
+            ),
+        ]
+    )
+    db.commit()
+    db.close()
+
+    load_bars_from_db()
+
+    with TestClient(app) as client:
+        _login(client)
+        text = client.get(f"/bars/{bar_id}").text
+        assert text.index("EarlyItem") < text.index("LateItem")
+
+        resp = client.post(
+            f"/bar/{bar_id}/categories/{early_id}/edit",
+            data={"display_order": "5"},
+            follow_redirects=False,
+        )
+        assert resp.status_code == 303
+        text = client.get(f"/bars/{bar_id}").text
+        assert text.index("LateItem") < text.index("EarlyItem")
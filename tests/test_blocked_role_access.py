@@ -54,3 +54,21 @@ def test_blocked_user_redirects_and_can_view_notifications():
         notifications_page = client.get('/notifications')
         assert notifications_page.status_code == 200
         assert 'Update' in notifications_page.text
+
+
+def test_admin_pages_redirect_non_admins():
+    setup_db()
+    with TestClient(app) as client:
+        for path in ('/admin/dashboard', '/admin/profile', '/admin/users', '/admin/bars'):
+            resp = client.get(path, follow_redirects=False)
+            assert resp.status_code == 303
+            assert resp.headers['location'] == '/'
+
+
+def test_admin_actions_redirect_non_admins():
+    setup_db()
+    with TestClient(app) as client:
+        for path in ('/admin/bars/new', '/admin/users/new', '/admin/ip-block', '/admin/orders/clear'):
+            resp = client.post(path, follow_redirects=False)
+            assert resp.status_code == 303
+            assert resp.headers['location'] == '/'
@@ -9,7 +9,16 @@ sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
 from fastapi.testclient import TestClient  # noqa: E402
 from database import Base, SessionLocal, engine  # noqa: E402
 from models import Bar, Category, MenuItem, User  # noqa: E402
-from main import app, user_carts, users, bars, get_cart_for_user, load_bars_from_db  # noqa: E402
+from main import (  # noqa: E402
+    Cart,
+    Product,
+    app,
+    bars,
+    get_cart_for_user,
+    load_bars_from_db,
+    user_carts,
+    users,
+)
 
 
 def reset_db():
@@ -50,3 +59,22 @@ def test_clear_cart_endpoint():
     demo_user = users[user_id]
     cart = get_cart_for_user(demo_user)
     assert len(cart.items) == 0
+
+
+def test_cart_count_tracks_mutations():
+    cart = Cart()
+    beer = Product(1, 1, "Beer", 5.0, "")
+    wine = Product(2, 1, "Wine", 7.0, "")
+    cart.add(beer)
+    cart.add(beer)
+    cart.add(wine)
+    assert cart.count == 3
+    cart.update_quantity(beer.id, 5)
+    assert cart.count == 6
+    cart.remove(wine.id)
+    assert cart.count == 5
+    cart.update_quantity(beer.id, 0)
+    assert cart.count == 0
+    cart.add(wine)
+    cart.clear()
+    assert cart.count == 0
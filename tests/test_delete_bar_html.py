@@ -7,7 +7,16 @@ sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
 
 from fastapi.testclient import TestClient  # noqa: E402
 from database import Base, SessionLocal, engine  # noqa: E402
-from models import Bar  # noqa: E402
+from decimal import Decimal  # noqa: E402
+
+from models import (  # noqa: E402
+    Bar,
+    Category,
+    MenuItem,
+    MenuVariant,
+    Order,
+    OrderItem,
+)
 from main import app, DemoUser, users, users_by_email, users_by_username  # noqa: E402
 
 
@@ -57,3 +66,57 @@ def test_admin_bars_delete_form_and_delete():
     check_db = SessionLocal()
     assert check_db.get(Bar, bar.id) is None
     check_db.close()
+
+
+def test_delete_bar_removes_menu_and_orders():
+    db = SessionLocal()
+    bar = Bar(name="Child Bar", slug="child-bar")
+    other = Bar(name="Other Bar", slug="other-bar")
+    db.add_all([bar, other])
+    db.commit()
+    bar_id, other_id = bar.id, other.id
+    category = Category(bar_id=bar_id, name="Drinks")
+    db.add(category)
+    db.commit()
+    item = MenuItem(
+        bar_id=bar_id, category_id=category.id, name="Beer", price_chf=Decimal("5.00")
+    )
+    db.add(item)
+    db.commit()
+    db.add(MenuVariant(menu_item_id=item.id, name="Large"))
+    order = Order(bar_id=bar_id)
+    other_order = Order(bar_id=other_id)
+    db.add_all([order, other_order])
+    db.commit()
+    db.add_all(
+        [
+            OrderItem(
+                order_id=order.id,
+                menu_item_id=item.id,
+                unit_price=Decimal("5.00"),
+                line_total=Decimal("5.00"),
+            ),
+            OrderItem(
+                order_id=other_order.id,
+                unit_price=Decimal("2.00"),
+                line_total=Decimal("2.00"),
+            ),
+        ]
+    )
+    db.commit()
+    db.close()
+
+    admin = users[1]
+    client = TestClient(app)
+    client.post("/login", data={"email": admin.email, "password": admin.password})
+    resp = client.post(f"/admin/bars/{bar_id}/delete", follow_redirects=False)
+    assert resp.status_code == 303
+
+    check_db = SessionLocal()
+    assert check_db.get(Bar, bar_id) is None
+    assert check_db.query(MenuItem).filter_by(bar_id=bar_id).count() == 0
+    assert check_db.query(MenuVariant).count() == 0
+    assert check_db.query(Order).filter_by(bar_id=bar_id).count() == 0
+    assert check_db.query(OrderItem).count() == 1
+    assert check_db.query(Order).filter_by(bar_id=other_id).count() == 1
+    check_db.close()
@@ -36,3 +36,31 @@ def test_session_survives_restart():
         resp = client.get("/profile")
         assert resp.status_code == 200
         assert "Profile" in resp.text
+
+
+def test_login_upgrades_legacy_password_hash():
+    reset_db()
+    users.clear()
+    users_by_email.clear()
+    users_by_username.clear()
+    db = SessionLocal()
+    pwd = hashlib.sha256("pass".encode("utf-8")).hexdigest()
+    user = User(username="legacy", email="legacy@example.com", password_hash=pwd)
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+
+    with TestClient(app) as client:
+        resp = client.post(
+            "/login",
+            data={"email": "legacy@example.com", "password": "pass"},
+            follow_redirects=False,
+        )
+        assert resp.status_code == 303
+
+    db = SessionLocal()
+    stored = db.get(User, user_id).password_hash
+    db.close()
+    assert stored.startswith("$argon2")
+    assert users[user_id].password_hash == stored
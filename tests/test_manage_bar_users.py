@@ -8,9 +8,10 @@ os.environ["DATABASE_URL"] = "sqlite:///:memory:"
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
 
 from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
 from database import Base, SessionLocal, engine  # noqa: E402
-from models import Bar, User, RoleEnum, UserBarRole  # noqa: E402
-from main import app  # noqa: E402
+from models import Bar, User, RoleEnum, UserBarRole, WalletTransaction  # noqa: E402
+from main import app, bars, users, users_by_email, users_by_username  # noqa: E402
 
 
 def setup_module(module):
@@ -126,3 +127,65 @@ def test_remove_user_from_bar():
     )
     assert rel is None
     db.close()
+
+
+def _add_staff_bar(slug: str, size: int) -> tuple[int, list[int]]:
+    db = SessionLocal()
+    bar = Bar(name=f"Bar {slug}", slug=slug)
+    db.add(bar)
+    staff = [
+        User(
+            username=f"{slug}{i}",
+            email=f"{slug}{i}@example.com",
+            password_hash="x",
+            role=RoleEnum.BARTENDER,
+        )
+        for i in range(size)
+    ]
+    db.add_all(staff)
+    db.commit()
+    for member in staff:
+        db.add(UserBarRole(user_id=member.id, bar_id=bar.id, role=RoleEnum.BARTENDER))
+    db.add(WalletTransaction(user_id=staff[0].id, type="topup", total=5))
+    db.commit()
+    ids = (bar.id, [member.id for member in staff])
+    db.close()
+    return ids
+
+
+def test_staff_list_loads_uncached_users_in_batch():
+    small_bar, small_staff = _add_staff_bar("small", 2)
+    large_bar, large_staff = _add_staff_bar("large", 6)
+    statements: list[str] = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with TestClient(app) as client:
+        _login_super_admin(client)
+        # Warm up per-session state (e.g. the admin's cart) before counting.
+        client.get(f"/admin/bars/{small_bar}/users")
+        counts = []
+        for bar_id, staff_ids in ((small_bar, small_staff), (large_bar, large_staff)):
+            for uid in staff_ids:
+                users.pop(uid, None)
+            statements.clear()
+            event.listen(engine, "before_cursor_execute", count)
+            try:
+                resp = client.get(f"/admin/bars/{bar_id}/users")
+            finally:
+                event.remove(engine, "before_cursor_execute", count)
+            assert resp.status_code == 200
+            assert all(f">{users[uid].username}<" in resp.text for uid in staff_ids)
+            counts.append(len(statements))
+
+    # Uncached staff are loaded in a fixed number of queries, not per person.
+    assert counts[0] == counts[1]
+    assert users[large_staff[0]].bar_ids == [large_bar]
+    assert len(users[large_staff[0]].transactions) == 1
+    assert users[large_staff[1]].transactions == []
+    for uid in small_staff + large_staff:
+        users.pop(uid, None)
+    users_by_email.clear()
+    users_by_username.clear()
+    bars.clear()
@@ -35,3 +35,13 @@ def test_is_open_now_respects_timezone(monkeypatch):
 
     monkeypatch.setattr(main, "datetime", FakeDatetimeClosed)
     assert not main.is_open_now_from_hours(hours)
+
+
+def test_is_open_now_uses_given_time_and_bounds():
+    hours = {"0": {"open": "14:00", "close": "15:30"}, "1": {"open": "bad", "close": "15:30"}}
+    monday = datetime(2024, 1, 1)
+    assert main.is_open_now_from_hours(hours, monday.replace(hour=14))
+    assert main.is_open_now_from_hours(hours, monday.replace(hour=15, minute=29, second=59))
+    assert not main.is_open_now_from_hours(hours, monday.replace(hour=15, minute=30))
+    assert not main.is_open_now_from_hours(hours, monday.replace(hour=13, minute=59))
+    assert not main.is_open_now_from_hours(hours, datetime(2024, 1, 2, 15))
@@ -1,3 +1,4 @@
+import asyncio
 import io
 import os
 import sys
@@ -8,6 +9,8 @@ sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
 
 from decimal import Decimal
 from PIL import Image
+import pytest
+from fastapi import UploadFile
 from fastapi.testclient import TestClient  # noqa: E402
 from database import Base, engine, SessionLocal  # noqa: E402
 from models import (
@@ -16,7 +19,10 @@ from models import (
     MenuItem,
     ProductImage,
 )  # noqa: E402
+import main  # noqa: E402
 from main import (
+    ImageUploadError,
+    process_image_upload,
     app,
     DemoUser,
     users,
@@ -224,3 +230,11 @@ def test_upload_product_photo_requires_staff_access():
     users_by_email.clear()
     users_by_username.clear()
     bars.clear()
+
+
+def test_process_image_upload_rejects_oversized_file(monkeypatch):
+    monkeypatch.setattr(main, "MAX_PRODUCT_IMAGE_BYTES", 16)
+    upload = UploadFile(file=io.BytesIO(make_image_bytes("PNG")), filename="big.png")
+    with pytest.raises(ImageUploadError, match="5MB"):
+        asyncio.run(process_image_upload(upload))
+    assert upload.file.closed
@@ -6,9 +6,10 @@ os.environ["DATABASE_URL"] = "sqlite:///:memory:"
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
 
 from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import update  # noqa: E402
 from database import Base, SessionLocal, engine  # noqa: E402
 from models import Bar  # noqa: E402
-from main import app  # noqa: E402
+from main import app, load_bars_from_db  # noqa: E402
 
 
 def setup_module(module):
@@ -36,3 +37,34 @@ def test_search_recent_section_shows_only_visited():
         assert "Visited Bar" in recent_section
         assert "Other Bar" not in recent_section
 
+
+
+def test_api_search_matches_any_field_case_insensitively():
+    db = SessionLocal()
+    db.add(Bar(name="Harbour Pub", slug="harbour-pub", city="Lugano", state="TI"))
+    db.commit()
+    db.close()
+    load_bars_from_db()
+
+    with TestClient(app) as client:
+        names = [b["name"] for b in client.get("/api/search?q=LUGANO").json()["bars"]]
+        assert "Harbour Pub" in names
+        assert client.get("/api/search?q=zurich").json()["bars"] == []
+
+
+def test_search_page_matches_current_row_not_stale_mirror():
+    db = SessionLocal()
+    bar = Bar(name="Old Tavern", slug="old-tavern")
+    db.add(bar)
+    db.commit()
+    bar_id = bar.id
+    db.close()
+
+    with TestClient(app) as client:
+        # Renamed behind the in-memory mirror's back, e.g. by another worker.
+        db = SessionLocal()
+        db.execute(update(Bar).where(Bar.id == bar_id).values(name="New Tavern"))
+        db.commit()
+        db.close()
+        assert "New Tavern" in client.get("/search?q=new+tavern").text
+        assert "New Tavern" not in client.get("/search?q=old+tavern").text
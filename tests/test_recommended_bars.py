@@ -9,7 +9,7 @@ sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
 from fastapi.testclient import TestClient  # noqa: E402
 from database import Base, SessionLocal, engine  # noqa: E402
 from models import Bar  # noqa: E402
-from main import app  # noqa: E402
+from main import _reservoir_sample, app  # noqa: E402
 
 
 def reset_db():
@@ -53,3 +53,11 @@ def test_recommended_only_open_within_20km():
         assert "FarOpen" not in section
         assert "NearClosed" not in section
 
+
+
+def test_reservoir_sample_caps_and_keeps_items():
+    assert _reservoir_sample(iter([1, 2, 3]), 5) == [1, 2, 3]
+    picked = _reservoir_sample(range(100), 5)
+    assert len(picked) == 5
+    assert len(set(picked)) == 5
+    assert all(0 <= n < 100 for n in picked)
@@ -42,3 +42,30 @@ def test_register_email_format_validation():
         )
         assert resp_ok.status_code == 303
         assert resp_ok.headers["location"] == "/register/details"
+
+
+def test_register_email_is_case_insensitive():
+    with TestClient(app) as client:
+        resp = client.post(
+            "/register",
+            data={
+                "email": " Mixed@Example.com ",
+                "password": "pass1234",
+                "confirm_password": "pass1234",
+            },
+            follow_redirects=False,
+        )
+        assert resp.status_code == 303
+    assert "mixed@example.com" in users_by_email
+
+    with TestClient(app) as client:
+        resp = client.post(
+            "/register",
+            data={
+                "email": "mixed@example.com",
+                "password": "pass1234",
+                "confirm_password": "pass1234",
+            },
+            follow_redirects=False,
+        )
+        assert resp.status_code == 400
@@ -64,3 +64,12 @@ def test_x_forwarded_for_accepted_from_trusted_proxy(monkeypatch):
     )
     ip = get_request_ip(request)
     assert ip == "198.51.100.10"
+
+
+def test_html_responses_are_not_gzipped():
+    reset_db()
+    with TestClient(app) as client:
+        response = client.get("/login", headers={"accept-encoding": "gzip"})
+        assert response.status_code == 200
+        assert len(response.content) > 1024
+        assert "content-encoding" not in response.headers
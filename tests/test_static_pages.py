@@ -17,3 +17,10 @@ def test_footer_pages_render():
             response = client.get(path)
             assert response.status_code == 200
             assert heading in response.text
+
+
+def test_healthz_reports_ok():
+    with TestClient(app) as client:
+        response = client.get("/healthz")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok"}
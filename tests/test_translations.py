@@ -64,3 +64,16 @@ def test_translation_values_are_non_empty_strings() -> None:
         for path, value in iter_leaf_items(data):
             assert isinstance(value, str), f"{code}:{path} is not a string (got {type(value).__name__})."
             assert value.strip(), f"{code}:{path} is an empty string."
+
+
+def test_translate_resolves_nested_keys_with_fallback() -> None:
+    from app.i18n import load_translations as load_runtime, translate
+
+    load_runtime()
+    baseline = load_translations()["en"]
+    path, value = next(
+        (p, v) for p, v in iter_leaf_items(baseline) if isinstance(v, str)
+    )
+    assert translate(path, language="en") == value
+    assert translate(path + ".missing", language="de", default="x") == "x"
+    assert translate("no.such.key") == "no.such.key"
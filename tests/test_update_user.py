@@ -369,6 +369,67 @@ def test_update_user_multiple_bar_assignment():
     db.close()
 
 
+def test_update_user_role_change_keeps_bar_assignment():
+    db = SessionLocal()
+    password_hash = hashlib.sha256("pass".encode("utf-8")).hexdigest()
+    bar1 = Bar(name="Keep1", slug="keep1")
+    bar2 = Bar(name="Keep2", slug="keep2")
+    db.add_all([bar1, bar2])
+    db.commit()
+    bar1_id, bar2_id = bar1.id, bar2.id
+    user = User(
+        username="rolechange",
+        email="rolechange@example.com",
+        password_hash=password_hash,
+        role=RoleEnum.BARTENDER,
+        phone="0790000004",
+        prefix="+41",
+        phone_e164="+41790000004",
+        phone_region="CH",
+    )
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.add_all(
+        [
+            UserBarRole(user_id=user_id, bar_id=bar1_id, role=RoleEnum.BARTENDER),
+            UserBarRole(user_id=user_id, bar_id=bar2_id, role=RoleEnum.BARTENDER),
+        ]
+    )
+    db.commit()
+    db.close()
+
+    db = SessionLocal()
+    refresh_bar_from_db(bar1_id, db)
+    refresh_bar_from_db(bar2_id, db)
+    db.close()
+
+    with TestClient(app) as client:
+        _login_super_admin(client)
+        form = {
+            "username": "rolechange",
+            "email": "rolechange@example.com",
+            "prefix": "",
+            "phone": "",
+            "role": "bar_admin",
+            "bar_ids": str(bar1_id),
+            "add_credit": "0",
+            "remove_credit": "0",
+        }
+        resp = client.post(
+            f"/admin/users/edit/{user_id}", data=form, follow_redirects=False
+        )
+        assert resp.status_code == 303
+
+    db = SessionLocal()
+    roles = db.query(UserBarRole).filter(UserBarRole.user_id == user_id).all()
+    assert [(r.bar_id, r.role) for r in roles] == [(bar1_id, RoleEnum.BARADMIN)]
+    db.close()
+    assert user_id in bars[bar1_id].bar_admin_ids
+    assert user_id not in bars[bar1_id].bartender_ids
+    assert user_id not in bars[bar2_id].bartender_ids
+
+
 def test_blocking_user_clears_cart():
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
@@ -602,3 +663,89 @@ def test_admin_users_shows_reassigned_bar_after_restart():
             rf"<tr>\s*<td>reloaduser</td>.*?<td>\s*{bar2_name}\s*</td>", re.DOTALL
         )
         assert pattern.search(resp.text)
+
+
+def test_admin_users_list_is_paginated(monkeypatch):
+    import main
+
+    db = SessionLocal()
+    user = User(
+        username="lastpageuser",
+        email="lastpage@example.com",
+        password_hash=hashlib.sha256("pass".encode("utf-8")).hexdigest(),
+        role=RoleEnum.CUSTOMER,
+    )
+    db.add(user)
+    db.commit()
+    db.close()
+
+    monkeypatch.setattr(main, "ADMIN_USERS_PAGE_SIZE", 1)
+    with TestClient(app) as client:
+        _login_super_admin(client)
+        resp = client.get("/admin/users?page=9999")
+        assert resp.status_code == 200
+        assert "lastpageuser" in resp.text
+        assert "prefixuser" not in resp.text
+        assert "?page=" in resp.text
+
+
+def test_admin_users_search_spans_all_pages(monkeypatch):
+    import main
+
+    db = SessionLocal()
+    for name in ("needle_user", "needlexuser"):
+        db.add(
+            User(
+                username=name,
+                email=f"{name}@example.com",
+                password_hash=hashlib.sha256("pass".encode("utf-8")).hexdigest(),
+                role=RoleEnum.CUSTOMER,
+            )
+        )
+    db.commit()
+    db.close()
+
+    monkeypatch.setattr(main, "ADMIN_USERS_PAGE_SIZE", 1)
+    with TestClient(app) as client:
+        _login_super_admin(client)
+        resp = client.get("/admin/users?q=NEEDLE_")
+        assert resp.status_code == 200
+        # ``_`` is matched literally, not as a LIKE wildcard, and the match
+        # is not limited to the first page.
+        assert "needle_user" in resp.text
+        assert "needlexuser" not in resp.text
+        assert "users-pagination" not in resp.text
+
+
+def test_update_user_invalid_credit_changes_nothing():
+    db = SessionLocal()
+    user = User(
+        username="creditcheck",
+        email="creditcheck@example.com",
+        password_hash=hashlib.sha256("pass".encode("utf-8")).hexdigest(),
+        role=RoleEnum.CUSTOMER,
+    )
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+
+    with TestClient(app) as client:
+        _login_super_admin(client)
+        form = {
+            "username": "renamed",
+            "email": "creditcheck@example.com",
+            "prefix": "",
+            "phone": "",
+            "role": "bartender",
+            "add_credit": "lots",
+            "remove_credit": "0",
+        }
+        resp = client.post(
+            f"/admin/users/edit/{user_id}", data=form, follow_redirects=False
+        )
+        assert resp.status_code == 200
+        assert "Invalid credit amount" in resp.text
+
+    assert users[user_id].username == "creditcheck"
+    assert users[user_id].role == "customer"